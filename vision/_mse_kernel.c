@@ -0,0 +1,105 @@
+/*
+ * Batched sum-of-squared-differences between one uint8 tile and K uint8
+ * reference rows, used by tile_character_extractor.classify_tile.
+ *
+ * The AVX-512 VNNI and AVX2 kernels are compiled with per-function target
+ * attributes and picked by CPUID on first call, so one build runs anywhere.
+ *
+ * Single-threaded on purpose: the caller already classifies tiles on a
+ * thread per core, and the rescoring calls cover only PREFILTER_TOP_K rows.
+ *
+ * Build (loaded via ctypes if present, NumPy fallback otherwise):
+ *     cc -O3 -shared -fPIC _mse_kernel.c -o _mse_kernel.so
+ */
+#include <stdint.h>
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#define MSE_X86 1
+#include <immintrin.h>
+#endif
+
+typedef int32_t (*sse_fn)(const uint8_t *, const uint8_t *, int);
+
+static int32_t sse_tail(const uint8_t *tile, const uint8_t *ref, int j, int n)
+{
+    int32_t total = 0;
+    for (; j < n; j++) {
+        int32_t d = (int32_t)tile[j] - (int32_t)ref[j];
+        total += d * d;
+    }
+    return total;
+}
+
+static int32_t sse_row_scalar(const uint8_t *tile, const uint8_t *ref, int n)
+{
+    return sse_tail(tile, ref, 0, n);
+}
+
+#ifdef MSE_X86
+__attribute__((target("avx2")))
+static int32_t sse_row_avx2(const uint8_t *tile, const uint8_t *ref, int n)
+{
+    int j = 0;
+    const __m256i zero = _mm256_setzero_si256();
+    __m256i acc = _mm256_setzero_si256();
+    for (; j + 32 <= n; j += 32) {
+        __m256i t = _mm256_loadu_si256((const __m256i *)(tile + j));
+        __m256i r = _mm256_loadu_si256((const __m256i *)(ref + j));
+        /* |t - r| in unsigned bytes, then widen and square-accumulate */
+        __m256i d = _mm256_sub_epi8(_mm256_max_epu8(t, r), _mm256_min_epu8(t, r));
+        __m256i lo = _mm256_unpacklo_epi8(d, zero);
+        __m256i hi = _mm256_unpackhi_epi8(d, zero);
+        acc = _mm256_add_epi32(acc, _mm256_madd_epi16(lo, lo));
+        acc = _mm256_add_epi32(acc, _mm256_madd_epi16(hi, hi));
+    }
+    __m128i s = _mm_add_epi32(_mm256_castsi256_si128(acc),
+                              _mm256_extracti128_si256(acc, 1));
+    s = _mm_add_epi32(s, _mm_shuffle_epi32(s, _MM_SHUFFLE(1, 0, 3, 2)));
+    s = _mm_add_epi32(s, _mm_shuffle_epi32(s, _MM_SHUFFLE(2, 3, 0, 1)));
+    return _mm_cvtsi128_si32(s) + sse_tail(tile, ref, j, n);
+}
+
+/* 64 bytes per step; VPDPWSSD fuses the int16 square and the int32 add.
+ * |t - r| spans 0..255, which fits int16 but not the int8 operand of
+ * VPDPBUSD, so the word form is used. */
+__attribute__((target("avx512f,avx512bw,avx512vnni")))
+static int32_t sse_row_vnni(const uint8_t *tile, const uint8_t *ref, int n)
+{
+    int j = 0;
+    const __m512i zero = _mm512_setzero_si512();
+    __m512i acc = _mm512_setzero_si512();
+    for (; j + 64 <= n; j += 64) {
+        __m512i t = _mm512_loadu_si512((const void *)(tile + j));
+        __m512i r = _mm512_loadu_si512((const void *)(ref + j));
+        __m512i d = _mm512_sub_epi8(_mm512_max_epu8(t, r), _mm512_min_epu8(t, r));
+        __m512i lo = _mm512_unpacklo_epi8(d, zero);
+        __m512i hi = _mm512_unpackhi_epi8(d, zero);
+        acc = _mm512_dpwssd_epi32(acc, lo, lo);
+        acc = _mm512_dpwssd_epi32(acc, hi, hi);
+    }
+    return _mm512_reduce_add_epi32(acc) + sse_tail(tile, ref, j, n);
+}
+#endif
+
+static sse_fn select_kernel(void)
+{
+#ifdef MSE_X86
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx512vnni") && __builtin_cpu_supports("avx512bw"))
+        return sse_row_vnni;
+    if (__builtin_cpu_supports("avx2"))
+        return sse_row_avx2;
+#endif
+    return sse_row_scalar;
+}
+
+/* out[k] = sum_j (tile[j] - refs[k*n + j])^2 for k in [0, K) */
+void mse_batch(const uint8_t *tile, const uint8_t *refs, int K, int n, int32_t *out)
+{
+    static sse_fn sse_row = 0;
+    int k;
+    if (!sse_row)
+        sse_row = select_kernel();
+    for (k = 0; k < K; k++)
+        out[k] = sse_row(tile, refs + (int64_t)k * n, n);
+}
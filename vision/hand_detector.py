@@ -7,6 +7,7 @@ Detects if there are any hands in an image.
 import cv2
 import numpy as np
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +150,38 @@ class HandDetector:
             # On error, assume no hands (fail open) to avoid blocking captures
             return False
     
+    def start_stream(self, get_frame, on_hand_away, consecutive_frames=4, interval=0.25, preprocess=None):
+        """
+        Watch a live frame source on a background thread and report when hands leave.
+        
+        Args:
+            get_frame: Callable returning the latest frame (or None)
+            on_hand_away: Called once with the last frame after consecutive_frames
+                          hand-free frames in a row; the watcher then exits
+            consecutive_frames: Hand-free frames required in a row (default: 4)
+            interval: Seconds between frames (default: 0.25)
+            preprocess: Optional callable applied to each frame before detection
+        
+        Returns:
+            threading.Event - set it to stop the watcher early
+        """
+        stop = threading.Event()
+        
+        def watch():
+            clear_count = 0
+            while not stop.is_set():
+                frame = get_frame()
+                if frame is not None:
+                    has_hands = self.detect_hands(preprocess(frame) if preprocess else frame)
+                    clear_count = 0 if has_hands else clear_count + 1
+                    if clear_count >= consecutive_frames:
+                        on_hand_away(frame)
+                        return
+                stop.wait(interval)
+        
+        threading.Thread(target=watch, daemon=True).start()
+        return stop
+    
     def __del__(self):
         """Cleanup MediaPipe resources."""
         if hasattr(self, 'hand_landmarker') and self.hand_landmarker is not None:
@@ -16,6 +16,7 @@ import numpy as np
 from oak import Oak
 from extract_tiles import TileExtractor
 from tile_character_extractor import (
+    MATCH_SIZE,
     load_reference_images,
     crop_tile,
     normalize,
@@ -39,6 +40,7 @@ def annotate_frame(gray, tiles, references):
     """
     output = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
     letters = []
+    norm_buf = np.empty((MATCH_SIZE, MATCH_SIZE), dtype=np.uint8)
 
     for rect in tiles:
         tile_crop = crop_tile(gray, rect)
@@ -50,7 +52,7 @@ def annotate_frame(gray, tiles, references):
             continue
 
         # Classify
-        crop_norm = normalize(tile_crop)
+        crop_norm = normalize(tile_crop, out=norm_buf)
         letter, mse = classify_tile(crop_norm, references)
 
         if letter:
@@ -84,17 +86,20 @@ def main():
 
     print("Starting live viewer – press 'q' to quit.\n")
 
+    # FPS is measured over ~1 s windows; the HUD string is only rebuilt then
     frame_count = 0
-    fps_start = time.time()
+    fps_start = time.monotonic()
+    fps_text = "FPS: --"
 
     # ── Main loop ─────────────────────────────────────────────────────
     try:
         while True:
-            gray = oak.get_gray()
+            # Blocks until the camera delivers a new frame (no polling, and
+            # no re-processing the previous frame)
+            gray = oak.get_gray(wait=True)
             if gray is None:
-                # Camera not ready yet – wait a bit and retry
-                time.sleep(0.01)
-                continue
+                print("ERROR: Camera returned no frame – stopping.")
+                break
 
             # Detect tiles
             tiles = TileExtractor._detect_tiles(gray)
@@ -109,13 +114,15 @@ def main():
 
             # Overlay FPS counter
             frame_count += 1
-            elapsed = time.time() - fps_start
-            if elapsed > 0:
-                fps = frame_count / elapsed
-                cv2.putText(
-                    output, f"FPS: {fps:.1f}  Tiles: {len(tiles)}",
-                    (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2,
-                )
+            elapsed = time.monotonic() - fps_start
+            if elapsed >= 1.0:
+                fps_text = f"FPS: {frame_count / elapsed:.1f}"
+                frame_count = 0
+                fps_start += elapsed
+            cv2.putText(
+                output, f"{fps_text}  Tiles: {len(tiles)}",
+                (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2,
+            )
 
             # Show letters summary at the bottom
             if letters:
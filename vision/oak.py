@@ -2,6 +2,7 @@
 import depthai as dai
 import os
 import cv2
+import numpy as np
 import time
 import atexit
 from generic_camera import GenericCamera
@@ -46,6 +47,7 @@ class Oak(GenericCamera):
         self.path = path
         self._camera_info = self.get_cam_data(self.load_cameras_yaml(), "oak")
         self.rgb = None
+        self._gray = None  # reused by get_gray, reallocated only if the frame size changes
         self._device_objects = {}  # Store device objects to prevent garbage collection
 
         for key, cam_cfg in self._camera_info.items():
@@ -117,18 +119,21 @@ class Oak(GenericCamera):
                 print("we have a frame")
                 frame = rgb_frame.getCvFrame()
                 
-    def get_rgb(self):
-        self.get_frame()
+    def get_rgb(self, wait=False):
+        self.get_frame(wait)
         return self.rgb
 
-    def get_frame(self):
+    def get_frame(self, wait=False):
         """Get the latest grayscale frame from the camera.
         
         Drains old frames from the queue to ensure we always get the most recent frame.
         This prevents getting stale/cropped frames when captures happen at different times.
+        With wait=True, blocks until the camera delivers a new frame if none is queued,
+        instead of leaving the previous one in place.
         """
         # Drain all old frames from the queue to get the latest one
         latest_frame = None
+        queue = None
         for key in self.devices.keys():
             queue = self.queues[key]["rgb"]
             # Keep getting frames until queue is empty (drain old frames)
@@ -138,14 +143,23 @@ class Oak(GenericCamera):
                     break
                 latest_frame = rgb_frame
         
+        if latest_frame is None and wait and queue is not None:
+            latest_frame = queue.get()  # blocks until the next frame
+        
         # Process the latest frame if we got one
         if latest_frame is not None:
             frame = latest_frame.getCvFrame()
             self.rgb = frame
             
-    def get_gray(self):
-        self.get_frame()
-        return cv2.cvtColor(self.rgb, cv2.COLOR_BGR2GRAY)
+    def get_gray(self, wait=False):
+        """Latest frame as grayscale, written into a buffer reused across calls:
+        copy the result before the next call if it must be kept."""
+        self.get_frame(wait)
+        if self.rgb is None:
+            return None
+        if self._gray is None or self._gray.shape != self.rgb.shape[:2]:
+            self._gray = np.empty(self.rgb.shape[:2], dtype=self.rgb.dtype)
+        return cv2.cvtColor(self.rgb, cv2.COLOR_BGR2GRAY, dst=self._gray)
 
     def _cleanup_on_exit(self):
         """Cleanup method registered with atexit - runs at Python shutdown."""
@@ -0,0 +1,54 @@
+"""Pack letter_data/A, B, ..., Z into one LMDB file for train_lenet_letter.py --lmdb. Re-run after adding images."""
+
+import os
+import sys
+import json
+import argparse
+
+try:
+    import lmdb
+except ImportError:
+    lmdb = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(SCRIPT_DIR, "letter_data")
+DEFAULT_LMDB_PATH = os.path.join(SCRIPT_DIR, "letter.lmdb")
+MAP_SIZE = 1 << 30  # 1 GiB address space; the file only grows to what is written
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pack letter_data into an LMDB of (label, PNG bytes) records")
+    ap.add_argument("--data", default=DEFAULT_DATA_DIR, help="Root dir with subdirs A, B, ..., Z")
+    ap.add_argument("--out", default=DEFAULT_LMDB_PATH, help="Output LMDB path")
+    args = ap.parse_args()
+
+    if lmdb is None:
+        print("lmdb package not installed. Install with: pip install lmdb")
+        return 1
+    if not os.path.isdir(args.data):
+        print("Data dir not found:", args.data)
+        return 1
+
+    # Same class order as torchvision's ImageFolder: sorted subdirectory names
+    classes = sorted(e.name for e in os.scandir(args.data) if e.is_dir())
+    env = lmdb.open(args.out, map_size=MAP_SIZE, subdir=False)
+    n = 0
+    with env.begin(write=True) as txn:
+        for label, cls in enumerate(classes):
+            cls_dir = os.path.join(args.data, cls)
+            for name in sorted(os.listdir(cls_dir)):
+                if not name.lower().endswith(".png"):
+                    continue
+                with open(os.path.join(cls_dir, name), "rb") as f:
+                    # Record: one label byte followed by the PNG file as-is
+                    txn.put(f"{n:08d}".encode(), bytes([label]) + f.read())
+                n += 1
+        txn.put(b"__classes__", json.dumps(classes).encode())
+        txn.put(b"__len__", str(n).encode())
+    env.close()
+    print(f"Packed {n} images ({len(classes)} classes) into {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,9 +27,9 @@ def main():
     for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
         os.makedirs(os.path.join(LETTER_DATA_DIR, c), exist_ok=True)
 
-    paths = sorted(glob.glob(os.path.join(crops_dir, "*.png")))
+    paths = sorted(glob.glob(os.path.join(crops_dir, "*.png")) + glob.glob(os.path.join(crops_dir, "*.pgm")))
     if not paths:
-        print(f"No PNGs in {crops_dir}.")
+        print(f"No PNG/PGM crops in {crops_dir}.")
         return 1
     print(f"Found {len(paths)} crops. Enter letter (A-Z) to copy into letter_data/<Letter>/, or Enter to skip.")
     copied = 0
@@ -50,13 +50,17 @@ def main():
             continue
         dest_dir = os.path.join(LETTER_DATA_DIR, letter)
         base, ext = os.path.splitext(name)
+        ext = ".png"  # letter_data loaders only pick up PNGs
         dest = os.path.join(dest_dir, f"{base}{ext}")
         if os.path.exists(dest):
             i = 1
             while os.path.exists(os.path.join(dest_dir, f"{base}_{i}{ext}")):
                 i += 1
             dest = os.path.join(dest_dir, f"{base}_{i}{ext}")
-        shutil.copy2(path, dest)
+        if path.lower().endswith(".png"):
+            shutil.copy2(path, dest)
+        else:
+            cv2.imwrite(dest, cv2.imread(path, cv2.IMREAD_GRAYSCALE))
         copied += 1
         print(f"    -> {dest}")
     if HAS_PLOT:
@@ -45,8 +45,13 @@ class ImageProcessor:
     BLACK_PIXEL_THRESH = 0.02
     INK_THRESHOLD = 140
 
-    def __init__(self, camera_config="camera.yaml", photo_path=None, use_cnn=True):
+    # Destination corners for _crop_tile, keyed by (size, pad). Tiles on a
+    # board are near-uniform so only a handful of sizes ever show up.
+    _dst_cache = {}
+
+    def __init__(self, camera_config="camera.yaml", photo_path=None, use_cnn=True, debug=False):
         self.extractor = TileExtractor(camera_config, photo_path=photo_path)
+        self._debug = debug  # write per-tile crops to crop_dir
         self.recognizer = None
         if use_cnn:
             # Prefer LeNet (train_lenet_letter.py), then LetterCNN, then TrOCR
@@ -81,10 +86,12 @@ class ImageProcessor:
     @staticmethod
     def _order_points(pts):
         """Order box points as [tl, tr, br, bl] for perspective warp."""
+        # Split into top/bottom pairs by y, then order each pair by x. Two
+        # 2-element sorts are cheaper than full-array NumPy reductions here.
         pts = np.asarray(pts, dtype=np.float32)
-        order = np.lexsort((pts[:, 0], pts[:, 1]))
-        ordered = pts[order]
-        tl, tr, bl, br = ordered[0], ordered[1], ordered[2], ordered[3]
+        pts = pts[np.argsort(pts[:, 1])]
+        tl, tr = sorted(pts[:2], key=lambda p: p[0])
+        bl, br = sorted(pts[2:], key=lambda p: p[0])
         return np.array([tl, tr, br, bl], dtype=np.float32)
 
     # ── Crop ─────────────────────────────────────────────────────────
@@ -111,56 +118,41 @@ class ImageProcessor:
         # Identify black pixels
         black_mask = (crop < black_threshold).astype(np.uint8)
         
-        # Use connected components to find all black regions
+        # Label components at full resolution (crops are ~128x128, so a
+        # downscale saves little and can merge strokes with the rim)
         num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
             black_mask, connectivity=8
         )
         
-        # Create mask: 1 for pixels to keep, 0 for pixels to remove
-        keep_mask = np.ones((h, w), dtype=np.uint8)
+        # Per-component bounding boxes
+        x = stats[:, cv2.CC_STAT_LEFT]
+        y = stats[:, cv2.CC_STAT_TOP]
+        x_end = x + stats[:, cv2.CC_STAT_WIDTH]
+        y_end = y + stats[:, cv2.CC_STAT_HEIGHT]
         
-        # Check each connected component
-        for label_id in range(1, num_labels):  # Skip background (label 0)
-            # Get all pixels in this component
-            component_mask = (labels == label_id)
-            component_y, component_x = np.where(component_mask)
-            
-            if len(component_y) == 0:
-                continue
-            
-            # Check if this component touches any edge
-            touches_edge = (
-                np.any(component_y == 0) or  # top edge
-                np.any(component_y == h - 1) or  # bottom edge
-                np.any(component_x == 0) or  # left edge
-                np.any(component_x == w - 1)  # right edge
-            )
-            
-            if not touches_edge:
-                # Component doesn't touch edge, keep it
-                continue
-            
-            # Component touches edge - check if it extends deep enough
-            # Calculate minimum distance from any edge
-            min_dist_from_top = np.min(component_y)
-            min_dist_from_bottom = h - 1 - np.max(component_y)
-            min_dist_from_left = np.min(component_x)
-            min_dist_from_right = w - 1 - np.max(component_x)
-            
-            min_dist_from_edge = min(
-                min_dist_from_top,
-                min_dist_from_bottom,
-                min_dist_from_left,
-                min_dist_from_right
-            )
-            
-            # If component doesn't reach deep enough, mark for removal
-            if min_dist_from_edge < depth_pixels:
-                keep_mask[component_mask] = 0
+        # Check if each component touches any edge
+        touches_edge = (x == 0) | (y == 0) | (x_end == w) | (y_end == h)
+        
+        # Minimum distance from any edge
+        min_dist_from_edge = np.minimum.reduce([y, h - y_end, x, w - x_end])
+        
+        # Edge-touching components that don't reach deep enough are removed
+        remove = touches_edge & (min_dist_from_edge < depth_pixels)
+        remove[0] = False  # background
         
-        # Apply mask: set removed pixels to white (background)
         result = crop.copy()
-        result[keep_mask == 0] = 255
+        if not remove.any():
+            return result
+        
+        # Whiten every pixel of the removed components in one lookup
+        result[remove[labels]] = 255
+        
+        return result
+        
+        # Upsample the removal mask and apply it to black pixels only
+        remove_small = remove[labels].astype(np.uint8)
+        remove_mask = cv2.resize(remove_small, (w, h), interpolation=cv2.INTER_NEAREST)
+        result[(remove_mask == 1) & (black_mask == 1)] = 255
         
         return result
 
@@ -186,11 +178,14 @@ class ImageProcessor:
         if size <= 0:
             return np.ones((128, 128), dtype=np.uint8) * 255
         
-        dst_pts = np.array(
-            [[pad, pad], [size - pad, pad],
-             [size - pad, size - pad], [pad, size - pad]],
-            dtype=np.float32,
-        )
+        dst_pts = ImageProcessor._dst_cache.get((size, pad))
+        if dst_pts is None:
+            dst_pts = np.array(
+                [[pad, pad], [size - pad, pad],
+                 [size - pad, size - pad], [pad, size - pad]],
+                dtype=np.float32,
+            )
+            ImageProcessor._dst_cache[(size, pad)] = dst_pts
         try:
             M = cv2.getPerspectiveTransform(src_pts, dst_pts)
         except cv2.error:
@@ -327,15 +322,13 @@ class ImageProcessor:
 
     @staticmethod
     def _preprocess_one(gray, rect, idx, crop_dir):
-        """Crop tile, check blank, save crop. Returns (idx, rect, crop, is_blank)."""
+        """Crop tile, check blank, save crop if crop_dir is set. Returns (idx, rect, crop, is_blank)."""
         crop = ImageProcessor._crop_tile(gray, rect)
         blank = ImageProcessor._is_blank(crop)
-        crop_path = os.path.join(crop_dir, f"tile_{idx:03d}.png")
-        if len(crop.shape) == 2:
-            cv2.imwrite(crop_path, crop)
-        else:
-            gray_crop = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if len(crop.shape) == 3 else crop
-            cv2.imwrite(crop_path, gray_crop)
+        if crop_dir:
+            # PGM is header + raw bytes, so encoding is essentially a memcpy
+            crop_path = os.path.join(crop_dir, f"tile_{idx:03d}.pgm")
+            cv2.imwrite(crop_path, crop, [cv2.IMWRITE_PXM_BINARY, 1])
         return idx, rect, crop, blank
 
     @staticmethod
@@ -360,12 +353,14 @@ class ImageProcessor:
     # ── Public API ───────────────────────────────────────────────────
 
     def process(self, output_path="output_boxes.jpg", crop_dir="crops-05"):
-        # Prepare crop directory
-        if os.path.exists(crop_dir):
-            shutil.rmtree(crop_dir)
-        os.makedirs(crop_dir)
+        # Prepare crop directory (debug output only)
+        if self._debug:
+            if os.path.exists(crop_dir):
+                shutil.rmtree(crop_dir)
+            os.makedirs(crop_dir)
+        else:
+            crop_dir = None
 
-        
         tiles, gray = self.extractor.extract()
         if gray is None or tiles is None:
             raise RuntimeError("Could not get a frame from the extractor")
@@ -421,5 +416,5 @@ if __name__ == "__main__":
     crop_dir = sys.argv[1] if len(sys.argv) > 1 else "crops-test"
     photo_path = sys.argv[2] if len(sys.argv) > 2 else None
     
-    processor = ImageProcessor(photo_path=photo_path)
+    processor = ImageProcessor(photo_path=photo_path, debug=True)
     processor.process(crop_dir=crop_dir)
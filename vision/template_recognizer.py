@@ -18,6 +18,8 @@ LETTER_ROI_FRAC = 0.70
 MIN_MATCH_SCORE = 0.44   # accept when correlation is decent
 # Winner must beat second-best by this much (stops "everything is O", but not too strict)
 MIN_WINNER_MARGIN = 0.03
+INK_THRESHOLD = 140      # below this = dark pixel
+BLANK_DARK_FRAC = 0.02   # fewer dark pixels than this fraction = blank tile
 
 
 def _letter_roi(img, center_frac=LETTER_ROI_FRAC):
@@ -62,11 +64,13 @@ def normalize_for_match(img, size=TEMPLATE_SIZE):
     return _center_letter(binary, size)
 
 
-def _match_score(prep, tpl):
-    """Correlation score in [0, 1]. Higher = better match."""
-    r = cv2.matchTemplate(prep, tpl, cv2.TM_CCOEFF_NORMED)
-    s = float(r[0, 0])
-    return (s + 1.0) / 2.0
+def _unit_vector(img):
+    """Flatten to a zero-mean, unit-norm float32 vector. The dot product of two
+    such vectors equals cv2.TM_CCOEFF_NORMED for same-size images."""
+    v = img.astype(np.float32).ravel()
+    v -= v.mean()
+    n = float(np.linalg.norm(v))
+    return v / n if n > 0 else v
 
 
 class TemplateRecognizer:
@@ -74,10 +78,12 @@ class TemplateRecognizer:
 
     def __init__(self, template_dir=None):
         self.template_dir = template_dir or DEFAULT_TEMPLATE_DIR
-        self._templates = []  # list of (letter, normalized 64x64 uint8)
+        self._letters = ""    # letter of each template, e.g. "ABC..."
+        self._Tall = None     # (n_templates, S*S) float32, one unit vector per row
         self._load_templates()
 
     def _load_templates(self):
+        tpls = []
         for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
             path = os.path.join(self.template_dir, f"{letter}.png")
             if not os.path.isfile(path):
@@ -86,35 +92,47 @@ class TemplateRecognizer:
             if img is None:
                 continue
             normalized = normalize_for_match(img, TEMPLATE_SIZE)
-            self._templates.append((letter, normalized))
-        if self._templates:
-            print(f"TemplateRecognizer: loaded {len(self._templates)} templates from {self.template_dir}")
+            tpls.append((letter, normalized))
+        if tpls:
+            self._letters = "".join(letter for letter, _ in tpls)
+            self._Tall = np.stack([_unit_vector(tpl) for _, tpl in tpls])
+            print(f"TemplateRecognizer: loaded {len(self._letters)} templates from {self.template_dir}")
         else:
             print(f"TemplateRecognizer: no templates in {self.template_dir}. Run build_templates.py first.")
 
     @property
     def available(self):
-        return len(self._templates) > 0
+        return len(self._letters) > 0
 
     def recognize(self, crop):
         """Return (letter_or_None, confidence_0_100). Uses 4 rotations and both polarities.
-        Only accepts when one template clearly wins (margin over second-best)."""
-        if not self._templates:
+        Only accepts when one template clearly wins (margin over second-best).
+
+        Inverting the crop negates its correlation with every template, so both
+        polarities are scored by one matrix-vector product; each polarity is
+        then checked for a clear winner on its own."""
+        if not self._letters:
+            return None, 0.0
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim > 2 else crop
+        # Cheap blank gate: skip all template work on tiles with no ink
+        dark = cv2.countNonZero(cv2.compare(gray, INK_THRESHOLD, cv2.CMP_LT))
+        if dark < BLANK_DARK_FRAC * gray.size:
             return None, 0.0
         prep = normalize_for_match(crop, TEMPLATE_SIZE)
-        # For each candidate (rotation, polarity), get best letter and score; require clear winner
+        # For each rotation, get best letter and score; require clear winner
         best_letter, best_score = None, -1.0
         for k in range(4):
             rot = prep if k == 0 else np.rot90(prep, k)
-            for img in (rot, 255 - rot):
-                scores = [(_match_score(img, tpl), letter) for letter, tpl in self._templates]
-                scores.sort(key=lambda x: -x[0])
-                first_score, first_letter = scores[0]
-                second_score = scores[1][0] if len(scores) > 1 else 0.0
+            corr = self._Tall @ _unit_vector(rot)
+            for polarity in (corr, -corr):
+                scores = (polarity + 1.0) / 2.0
+                order = np.argsort(-scores)
+                first_score = float(scores[order[0]])
+                second_score = float(scores[order[1]]) if len(order) > 1 else 0.0
                 margin_ok = (first_score - second_score) >= MIN_WINNER_MARGIN
                 if (first_score >= MIN_MATCH_SCORE and margin_ok and first_score > best_score):
                     best_score = first_score
-                    best_letter = first_letter
+                    best_letter = self._letters[order[0]]
         if best_letter is None:
             return None, 0.0
         conf = min(100.0, best_score * 100.0)
@@ -13,8 +13,15 @@ Matching approach:
   - A winner-margin is required so ambiguous tiles are flagged.
 """
 
+import ctypes
+import hashlib
 import os
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 import cv2
 import numpy as np
 
@@ -23,14 +30,46 @@ from extract_tiles import TileExtractor
 # ── Paths ────────────────────────────────────────────────────────────
 VISION_DIR = os.path.dirname(os.path.abspath(__file__))
 LETTER_DATA_DIR = os.path.join(VISION_DIR, "letter_data")
+REFBANK_CACHE = "refbank.npy"          # four stacked rotation banks, memory-mapped on load
+REFBANK_COARSE = "refbank_coarse.npy"  # their PREFILTER_SIZE downsample, memory-mapped on load
+REFBANK_LABELS = "refbank_labels.npz"  # sidecar: per-row labels, letter list, source fingerprint
 
 # ── Matching parameters ──────────────────────────────────────────────
 MATCH_SIZE = 64           # resize both crop and ref to this before comparing
+CROP_SIZE = 128           # crop_tile output: 80px letter area + 24px white border
 LETTER_ROI_FRAC = 0.70    # center-crop fraction to isolate the letter
 INK_THRESHOLD = 140       # below this = dark pixel
 BLACK_PIXEL_THRESH = 0.02 # min dark-pixel ratio to consider non-blank
 MIN_WINNER_MARGIN = 0.005 # best must beat second-best by this (MSE scale)
 ROTATION_PENALTY  = 0.008 # added to MSE for 90/270 rotations, prefer upright
+# Penalty added to each orientation (0, 90, 180, 270 degrees) so the upright
+# reading wins unless a rotation is clearly better; keeps rotationally
+# similar letters (L/J, etc.) apart.
+ORIENTATION_PENALTIES = (0.0, ROTATION_PENALTY, ROTATION_PENALTY / 2, ROTATION_PENALTY)
+PREFILTER_SIZE = 16       # coarse bank resolution used to shortlist references
+PREFILTER_TOP_K = 20      # (reference, rotation) pairs rescored at MATCH_SIZE
+
+
+# Optional compiled SSE kernel (_mse_kernel.c); NumPy is used when absent.
+try:
+    _mse_lib = ctypes.CDLL(os.path.join(VISION_DIR, "_mse_kernel.so"))
+    _mse_lib.mse_batch.restype = None
+    _mse_lib.mse_batch.argtypes = [
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p,
+    ]
+except OSError:
+    _mse_lib = None
+
+
+def _sse_batch(R, o):
+    """Sum of squared differences between uint8 vector o and every row of R."""
+    if _mse_lib is not None and R.flags.c_contiguous:
+        out = np.empty(R.shape[0], dtype=np.int32)
+        _mse_lib.mse_batch(o.ctypes.data, R.ctypes.data, R.shape[0], R.shape[1],
+                           out.ctypes.data)
+        return out
+    d = np.subtract(R, o, dtype=np.int16)
+    return np.einsum("kj,kj->k", d, d, dtype=np.int64)
 
 
 # ── Normalization (same pipeline for tile crops AND reference images) ─
@@ -44,24 +83,55 @@ def _letter_roi(img, center_frac=LETTER_ROI_FRAC):
     return img[y0:y1, x0:x1]
 
 
-_clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
+# CLAHE objects keep internal state per apply(), so each thread gets its own
+_clahe_tls = threading.local()
+
 
+def _clahe():
+    clahe = getattr(_clahe_tls, "clahe", None)
+    if clahe is None:
+        clahe = _clahe_tls.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
+    return clahe
 
-def normalize(img, size=MATCH_SIZE):
-    """ROI crop -> grayscale -> resize -> CLAHE equalize -> float [0,1]."""
+
+def normalize(img, size=MATCH_SIZE, out=None):
+    """ROI crop -> grayscale -> resize -> CLAHE equalize. Returns uint8.
+
+    The ROI is a view, and resize and CLAHE both write into out when a
+    (size, size) uint8 buffer is passed, so a caller reusing one buffer
+    across tiles allocates nothing per tile.
+    """
     if img.ndim > 2:
         img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     roi = _letter_roi(img, LETTER_ROI_FRAC)
-    resized = cv2.resize(roi, (size, size), interpolation=cv2.INTER_AREA)
-    eq = _clahe.apply(resized)
-    return eq.astype(np.float32) / 255.0
+    resized = cv2.resize(roi, (size, size), dst=out, interpolation=cv2.INTER_AREA)
+    return _clahe().apply(resized, dst=out)
 
 
-# ── Matching ─────────────────────────────────────────────────────────
+_CV_MAX_CHANNELS = 512  # cv2.resize accepts at most this many packed channels
 
-def _mse(a, b):
-    """Mean-squared error between two float images. Lower = better match."""
-    return float(np.mean((a - b) ** 2))
+
+def normalize_batch(imgs, size=MATCH_SIZE):
+    """normalize() over a list of grayscale images, resizing same-shaped
+    images together as packed channels of one cv2.resize call. CLAHE is
+    per-image in OpenCV, so it still runs per plane. Order is preserved."""
+    out = [None] * len(imgs)
+    groups = {}
+    for i, img in enumerate(imgs):
+        groups.setdefault(img.shape, []).append(i)
+
+    for idxs in groups.values():
+        for start in range(0, len(idxs), _CV_MAX_CHANNELS):
+            chunk = idxs[start:start + _CV_MAX_CHANNELS]
+            if len(chunk) == 1:
+                out[chunk[0]] = normalize(imgs[chunk[0]], size)
+                continue
+            block = np.dstack([_letter_roi(imgs[i], LETTER_ROI_FRAC) for i in chunk])
+            resized = cv2.resize(block, (size, size), interpolation=cv2.INTER_AREA)
+            clahe = _clahe()
+            for j, i in enumerate(chunk):
+                out[i] = clahe.apply(np.ascontiguousarray(resized[:, :, j]))
+    return out
 
 
 # ── Tile cropping (borrowed from process_image) ─────────────────────
@@ -74,20 +144,100 @@ def _order_points(pts):
     return np.array([tl, tr, br, bl], dtype=np.float32)
 
 
-def crop_tile(gray, rect, pad=6):
-    """Warp a rotated rect into an upright square crop (grayscale 128x128)."""
+def _box_points(rects):
+    """cv2.boxPoints for every rect at once -> float32 (N, 4, 2)."""
+    r = np.array([(cx, cy, w, h, a) for (cx, cy), (w, h), a in rects],
+                 dtype=np.float64).reshape(-1, 5)
+    cx, cy, w, h = r[:, 0], r[:, 1], r[:, 2], r[:, 3]
+    theta = np.deg2rad(r[:, 4])
+    b = np.cos(theta) * 0.5
+    a = np.sin(theta) * 0.5
+    p0 = np.stack([cx - a * h - b * w, cy + b * h - a * w], axis=-1)
+    p1 = np.stack([cx + a * h - b * w, cy - b * h - a * w], axis=-1)
+    c2 = 2 * r[:, None, :2]
+    return np.stack([p0, p1, c2[:, 0] - p0, c2[:, 0] - p1], axis=1).astype(np.float32)
+
+
+def _ordered_corners(boxes, shape):
+    """Clip (N, 4, 2) box corners to the image and order each quad as
+    tl, tr, br, bl -- the batched form of crop_tile's per-tile clip and
+    _order_points."""
+    h_img, w_img = shape[:2]
+    pts = np.empty_like(boxes)
+    np.clip(boxes[..., 0], 0, w_img - 1, out=pts[..., 0])
+    np.clip(boxes[..., 1], 0, h_img - 1, out=pts[..., 1])
+    order = np.lexsort((pts[..., 0], pts[..., 1]), axis=-1)[:, [0, 1, 3, 2]]
+    return np.take_along_axis(pts, order[..., None], axis=1)
+
+
+def _blank_crop(out=None):
+    if out is None:
+        return np.full((CROP_SIZE, CROP_SIZE), 255, dtype=np.uint8)
+    out.fill(255)
+    return out
+
+
+# Homogeneous destination pixel grid per warp size, and remap tables per
+# (source quad, size). The live viewer sees the same static tiles frame after
+# frame, so most lookups there hit the map cache and skip map generation.
+_dst_grid_cache = {}
+_map_cache = OrderedDict()
+_map_cache_lock = threading.Lock()
+_MAP_CACHE_MAX = 256
+
+
+def _dst_grid(size):
+    grid = _dst_grid_cache.get(size)
+    if grid is None:
+        ys, xs = np.indices((size, size), dtype=np.float32)
+        grid = np.stack([xs.ravel(), ys.ravel(), np.ones(size * size, np.float32)])
+        _dst_grid_cache[size] = grid
+    return grid
+
+
+def _build_perspective_maps(src_pts, dst_pts, size):
+    """Fixed-point remap tables sampling src_pts' quad into a size x size crop."""
+    key = (np.round(src_pts, 2).tobytes(), size)
+    with _map_cache_lock:
+        maps = _map_cache.get(key)
+        if maps is not None:
+            _map_cache.move_to_end(key)
+            return maps
+
+    Minv = cv2.getPerspectiveTransform(dst_pts, src_pts).astype(np.float32)
+    p = Minv @ _dst_grid(size)
+    mapx = (p[0] / p[2]).reshape(size, size)
+    mapy = (p[1] / p[2]).reshape(size, size)
+    maps = cv2.convertMaps(mapx, mapy, cv2.CV_16SC2)
+
+    with _map_cache_lock:
+        _map_cache[key] = maps
+        if len(_map_cache) > _MAP_CACHE_MAX:
+            _map_cache.popitem(last=False)
+    return maps
+
+
+def crop_tile(gray, rect, pad=6, out=None, src_pts=None):
+    """Warp a rotated rect into an upright square crop (grayscale 128x128).
+
+    If out is a preallocated (CROP_SIZE, CROP_SIZE) uint8 buffer the crop is
+    written into it instead of a fresh allocation. src_pts may carry the
+    rect's clipped, ordered corners when the caller computed them for all
+    tiles at once (see _ordered_corners).
+    """
     if rect[1][0] <= 0 or rect[1][1] <= 0:
-        return np.ones((128, 128), dtype=np.uint8) * 255
+        return _blank_crop(out)
 
-    src_pts = cv2.boxPoints(rect).astype(np.float32)
-    h_img, w_img = gray.shape
-    src_pts[:, 0] = np.clip(src_pts[:, 0], 0, w_img - 1)
-    src_pts[:, 1] = np.clip(src_pts[:, 1], 0, h_img - 1)
-    src_pts = _order_points(src_pts)
+    if src_pts is None:
+        src_pts = cv2.boxPoints(rect).astype(np.float32)
+        h_img, w_img = gray.shape
+        src_pts[:, 0] = np.clip(src_pts[:, 0], 0, w_img - 1)
+        src_pts[:, 1] = np.clip(src_pts[:, 1], 0, h_img - 1)
+        src_pts = _order_points(src_pts)
 
     size = int(max(rect[1])) + pad * 2
     if size <= 0:
-        return np.ones((128, 128), dtype=np.uint8) * 255
+        return _blank_crop(out)
 
     dst_pts = np.array(
         [[pad, pad], [size - pad, pad],
@@ -95,14 +245,12 @@ def crop_tile(gray, rect, pad=6):
         dtype=np.float32,
     )
     try:
-        M = cv2.getPerspectiveTransform(src_pts, dst_pts)
+        map1, map2 = _build_perspective_maps(src_pts, dst_pts, size)
     except cv2.error:
-        return np.ones((128, 128), dtype=np.uint8) * 255
+        return _blank_crop(out)
 
-    crop = cv2.warpPerspective(gray, M, (size, size),
-                               flags=cv2.INTER_LINEAR,
-                               borderMode=cv2.BORDER_CONSTANT,
-                               borderValue=255)
+    crop = cv2.remap(gray, map1, map2, cv2.INTER_LINEAR,
+                     borderMode=cv2.BORDER_CONSTANT, borderValue=255)
     h, w = crop.shape
     margin_h = int(h * 0.15)
     margin_w = int(w * 0.15)
@@ -111,121 +259,316 @@ def crop_tile(gray, rect, pad=6):
     else:
         inner = crop[margin_h:h - margin_h, margin_w:w - margin_w]
     inner = cv2.resize(inner, (80, 80), interpolation=cv2.INTER_CUBIC)
-    inner = cv2.copyMakeBorder(inner, 24, 24, 24, 24, cv2.BORDER_CONSTANT, value=255)
-    return inner
+    return cv2.copyMakeBorder(inner, 24, 24, 24, 24, cv2.BORDER_CONSTANT,
+                              dst=out, value=255)
 
 
 def is_blank(crop):
     """True if center region has too few dark pixels to be a letter."""
     h, w = crop.shape[:2]
     center = crop[h // 4:3 * h // 4, w // 4:3 * w // 4]
-    dark_ratio = np.sum(center < INK_THRESHOLD) / center.size
-    return dark_ratio < BLACK_PIXEL_THRESH
+    dark_count = cv2.countNonZero(cv2.compare(center, INK_THRESHOLD, cv2.CMP_LT))
+    return dark_count < center.size * BLACK_PIXEL_THRESH
 
 
 # ── Reference image loading ──────────────────────────────────────────
 
-def load_reference_images(letter_data_dir=LETTER_DATA_DIR):
-    """Load all non-synthetic reference images from letter_data/A..Z
-    AND from crops-NN directories (which have labeled files like A.png, B.png).
+def _crop_source_dirs():
+    """crops-NN directories holding labeled letter PNGs (A.png, B.png, ...)."""
+    with os.scandir(VISION_DIR) as it:
+        dirs = [entry.path for entry in it
+                if entry.name.startswith("crops-") and entry.name != "crops-test"
+                and entry.is_dir()]
+    return sorted(dirs)
 
-    Returns dict: { 'A': [norm_img1, norm_img2, ...], 'B': [...], ... }
-    """
-    references = {}
-    total = 0
 
-    # 1. Load from letter_data/A..Z (skip synthetics)
+def _reference_entries(letter_data_dir):
+    """(letter, DirEntry) for every reference PNG, in load order.
+
+    Reads letter_data/A..Z (skipping synthetics) and the crops-NN directories
+    (labeled files like A.png, B.png).
+    """
+    refs = []
     for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
         letter_dir = os.path.join(letter_data_dir, letter)
-        if not os.path.isdir(letter_dir):
+        try:
+            with os.scandir(letter_dir) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except (FileNotFoundError, NotADirectoryError):
             continue
-        refs = references.setdefault(letter, [])
-        for fname in sorted(os.listdir(letter_dir)):
-            if not fname.lower().endswith(".png"):
-                continue
-            # Skip synthetic images
-            if fname.lower().startswith("synth"):
-                continue
-            path = os.path.join(letter_dir, fname)
-            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-            if img is None:
+        for entry in entries:
+            fname = entry.name.lower()
+            if fname.endswith(".png") and not fname.startswith("synth"):
+                refs.append((letter, entry))
+
+    for crop_dir_path in _crop_source_dirs():
+        with os.scandir(crop_dir_path) as it:
+            entries = list(it)
+        for entry in entries:
+            if not entry.name.endswith(".png"):
                 continue
-            norm = normalize(img)
-            refs.append(norm)
-            total += 1
-
-    # 2. Also load from crops-NN directories (labeled letter PNGs)
-    for entry in sorted(os.listdir(VISION_DIR)):
-        if not entry.startswith("crops-") or entry == "crops-test":
-            continue
-        crop_dir_path = os.path.join(VISION_DIR, entry)
-        if not os.path.isdir(crop_dir_path):
-            continue
-        for fname in os.listdir(crop_dir_path):
-            if not fname.endswith(".png"):
-                continue
-            stem = os.path.splitext(fname)[0].upper()
+            stem = os.path.splitext(entry.name)[0].upper()
             if len(stem) != 1 or stem not in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
                 continue  # skip BAD.png, tile_000.png, etc.
-            letter = stem
-            path = os.path.join(crop_dir_path, fname)
-            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-            if img is None:
-                continue
-            norm = normalize(img)
-            references.setdefault(letter, []).append(norm)
-            total += 1
+            refs.append((stem, entry))
+    return refs
+
+
+def _sources_fingerprint(refs):
+    """Hash of every reference's path, mtime and size, so adding, removing
+    or overwriting a PNG in place invalidates the cached bank."""
+    digest = hashlib.sha256()
+    for letter, entry in refs:
+        st = entry.stat()
+        digest.update(f"{letter}\0{entry.path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def _load_cached_bank(letter_data_dir, fingerprint):
+    """Return the on-disk RefBank if it was built from the same sources, else None."""
+    rotated_path = os.path.join(letter_data_dir, REFBANK_CACHE)
+    coarse_path = os.path.join(letter_data_dir, REFBANK_COARSE)
+    labels_path = os.path.join(letter_data_dir, REFBANK_LABELS)
+    try:
+        with np.load(labels_path) as side:
+            if str(side["fingerprint"]) != fingerprint:
+                return None
+            labels = side["labels"]
+            letters = [str(letter) for letter in side["letters"]]
+        rotated = np.load(rotated_path, mmap_mode="r")
+        coarse = np.load(coarse_path, mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+    K = len(labels)
+    if (rotated.shape != (4 * K, MATCH_SIZE * MATCH_SIZE)
+            or coarse.shape != (4 * K, PREFILTER_SIZE * PREFILTER_SIZE)):
+        return None
+    # Rotation 0 is the upright bank itself
+    return RefBank(matrix=rotated[:K], labels=labels, letter_of_idx=letters,
+                   rotated=rotated, coarse=coarse)
+
+
+def _save_cached_bank(bank, letter_data_dir, fingerprint):
+    try:
+        np.save(os.path.join(letter_data_dir, REFBANK_CACHE), bank.rotated)
+        np.save(os.path.join(letter_data_dir, REFBANK_COARSE), bank.coarse)
+        # Sidecar last: it carries the fingerprint that validates the others
+        np.savez(os.path.join(letter_data_dir, REFBANK_LABELS),
+                 labels=bank.labels, letters=np.array(bank.letter_of_idx),
+                 fingerprint=np.array(fingerprint))
+    except OSError as e:
+        print(f"WARNING: could not write reference cache: {e}")
+
+
+def load_reference_images(letter_data_dir=LETTER_DATA_DIR, use_cache=True):
+    """Load all non-synthetic reference images from letter_data/A..Z
+    AND from crops-NN directories (which have labeled files like A.png, B.png).
+
+    The assembled bank, with its rotated and coarse banks, is cached as
+    letter_data/refbank*.np[yz] and reused (memory-mapped) while every
+    source PNG has the same path, mtime and size, which skips PNG decode,
+    CLAHE, resize and the rotation passes on every start.
+
+    Returns a RefBank, or None if no reference images were found.
+    """
+    refs = _reference_entries(letter_data_dir)
+    if use_cache:
+        fingerprint = _sources_fingerprint(refs)
+        bank = _load_cached_bank(letter_data_dir, fingerprint)
+        if bank is not None:
+            print(f"Loaded {bank.matrix.shape[0]} reference images across "
+                  f"{len(bank.letter_of_idx)} letters (cached)")
+            return bank
+
+    # Decode everything first, then normalize in one batched pass
+    letters, imgs = [], []
+    for letter, entry in refs:
+        img = cv2.imread(entry.path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        letters.append(letter)
+        imgs.append(img)
+
+    references = {}
+    for letter, norm in zip(letters, normalize_batch(imgs)):
+        references.setdefault(letter, []).append(norm)
+    total = len(imgs)
 
     print(f"Loaded {total} reference images across {len(references)} letters")
-    return references
+    bank = _stack_references(references)
+    if bank is not None and use_cache:
+        _save_cached_bank(bank, letter_data_dir, fingerprint)
+    return bank
+
+
+@dataclass
+class RefBank:
+    """All reference images as one contiguous block (struct-of-arrays).
+
+    matrix        – uint8 (K, MATCH_SIZE*MATCH_SIZE), one reference per row
+    labels        – int8 (K,), index into letter_of_idx for each row
+    letter_of_idx – letters that have at least one reference
+    rotated       – uint8 (4K, MATCH_SIZE*MATCH_SIZE), the four rotation banks
+                    stacked: rows [k*K, (k+1)*K) hold each reference turned by
+                    -k*90 degrees, so comparing the upright tile against them
+                    equals comparing the tile rotated by k
+    coarse        – uint8 (4K, PREFILTER_SIZE**2), rotated downsampled to
+                    PREFILTER_SIZE for the shortlist pass
+    rot_penalty   – float (4K,), ORIENTATION_PENALTIES per row of rotated
+    rot_labels    – int8 (4K,), labels per row of rotated
+
+    rotated and coarse are derived from matrix unless passed in (e.g.
+    memory-mapped from the on-disk cache).
+    """
+    matrix: np.ndarray
+    labels: np.ndarray
+    letter_of_idx: list
+    rotated: np.ndarray = field(default=None, repr=False)
+    coarse: np.ndarray = field(default=None, repr=False)
+    rot_penalty: np.ndarray = field(init=False, repr=False)
+    rot_labels: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        K = len(self.matrix)
+        if self.rotated is None:
+            imgs = self.matrix.reshape(-1, MATCH_SIZE, MATCH_SIZE)
+            self.rotated = np.concatenate([
+                np.rot90(imgs, -k, axes=(1, 2)).reshape(K, -1) for k in range(4)
+            ])
+        if self.coarse is None:
+            self.coarse = _downsample(
+                self.rotated.reshape(-1, MATCH_SIZE, MATCH_SIZE)
+            ).reshape(4 * K, -1)
+        self.rot_penalty = np.repeat(ORIENTATION_PENALTIES, K)
+        self.rot_labels = np.tile(self.labels, 4)
+
+
+def _downsample(imgs):
+    """Box-average (..., MATCH_SIZE, MATCH_SIZE) uint8 down to PREFILTER_SIZE."""
+    f = MATCH_SIZE // PREFILTER_SIZE
+    lead = imgs.shape[:-2]
+    blocks = imgs.reshape(*lead, PREFILTER_SIZE, f, PREFILTER_SIZE, f)
+    return np.rint(blocks.mean(axis=(-3, -1))).astype(np.uint8)
+
+
+def _stack_references(references):
+    """Flatten { 'A': [norm_img, ...], ... } into a RefBank so a tile can be
+    scored against every reference in one batched pass. None if no refs."""
+    letters = [letter for letter in sorted(references) if references[letter]]
+    if not letters:
+        return None
+    refs, letter_idx = [], []
+    for i, letter in enumerate(letters):
+        refs.extend(references[letter])
+        letter_idx.extend([i] * len(references[letter]))
+    R = np.ascontiguousarray(
+        np.stack(refs).reshape(-1, MATCH_SIZE * MATCH_SIZE), dtype=np.uint8
+    )
+    return RefBank(
+        matrix=R,
+        labels=np.array(letter_idx, dtype=np.int8),
+        letter_of_idx=letters,
+    )
 
 
 # ── Per-tile classification ──────────────────────────────────────────
 
-def classify_tile(crop_norm, references):
+def _score_rows(bank, o, o_small, rows, letter_scores):
+    """Fold the best MSE of bank rows [rows) into letter_scores (in place).
+
+    Every row in the range is scored on the coarse PREFILTER_SIZE bank; only
+    the best PREFILTER_TOP_K are rescored at full resolution.
+    """
+    lo, hi = rows
+    if hi - lo > PREFILTER_TOP_K:
+        coarse = _sse_batch(bank.coarse[lo:hi], o_small) / (255.0 ** 2 * o_small.size)
+        coarse += bank.rot_penalty[lo:hi]
+        cand = lo + np.argpartition(coarse, PREFILTER_TOP_K)[:PREFILTER_TOP_K]
+    else:
+        cand = np.arange(lo, hi)
+
+    # Integer squared differences, scaled back to the [0,1]-intensity MSE
+    # the thresholds are expressed in
+    sse = _sse_batch(bank.rotated[cand], o)
+    scores = sse / (255.0 ** 2 * o.size) + bank.rot_penalty[cand]
+    np.minimum.at(letter_scores, bank.rot_labels[cand], scores)
+
+
+def _top_two(letter_scores):
+    """(best_index, best_mse, second_mse) over per-letter scores.
+
+    second_mse is inf when no other letter had a shortlisted reference
+    (or the bank holds a single letter).
+    """
+    if len(letter_scores) > 1:
+        top2 = np.argpartition(letter_scores, 1)[:2]
+        top2 = top2[np.argsort(letter_scores[top2])]
+        second_mse = float(letter_scores[top2[1]])
+    else:
+        top2 = [0]
+        second_mse = np.inf
+    return top2[0], float(letter_scores[top2[0]]), second_mse
+
+
+def classify_tile(crop_norm, bank):
     """Compare a normalized tile crop against all reference images.
 
     Tries all four orientations (0, 90, 180, 270 degrees) since tiles can
-    end up in any rotation after perspective warp. For each letter, keeps
-    the best (min) MSE across all references and orientations.
+    end up in any rotation after perspective warp. The upright bank is scored
+    first; if it already yields a clear winner (margin above
+    3 * MIN_WINNER_MARGIN over a scored runner-up) the rotated banks are
+    skipped. Within each pass
+    references are shortlisted on the coarse PREFILTER_SIZE bank and only the
+    best PREFILTER_TOP_K are rescored at full resolution. For each letter,
+    keeps the best (min) MSE across scored pairs.
 
     Returns (best_letter, best_mse) or (None, best_mse).
     """
-    letter_scores = {}  # letter -> best MSE (lower = better)
-
-    # Try all four orientations (0, 90, 180, 270 degrees)
-    # Apply a penalty to rotated matches so the upright orientation is
-    # preferred unless a rotation gives a clearly better match. This
-    # prevents confusion between rotationally-similar letters (L/J, etc.)
-    orientations = [
-        (crop_norm,               0.0),                # 0°   – no penalty
-        (np.rot90(crop_norm, 1),  ROTATION_PENALTY),   # 90°
-        (np.rot90(crop_norm, 2),  ROTATION_PENALTY / 2),  # 180° – small penalty
-        (np.rot90(crop_norm, 3),  ROTATION_PENALTY),   # 270°
-    ]
+    letters = bank.letter_of_idx
+    o = np.ascontiguousarray(crop_norm).ravel()
+    o_small = _downsample(crop_norm).ravel()
+    K = len(bank.matrix)
+    letter_scores = np.full(len(letters), np.inf)  # best MSE per letter
 
-    for oriented, penalty in orientations:
-        for letter, ref_list in references.items():
-            for ref in ref_list:
-                score = _mse(oriented, ref) + penalty
-                if letter not in letter_scores or score < letter_scores[letter]:
-                    letter_scores[letter] = score
+    _score_rows(bank, o, o_small, (0, K), letter_scores)
+    best, best_mse, second_mse = _top_two(letter_scores)
+    # An unscored runner-up says nothing about the margin, so keep going
+    if np.isfinite(second_mse) and second_mse - best_mse > 3 * MIN_WINNER_MARGIN:
+        return letters[best], best_mse
 
-    # Sort by ascending MSE (best first)
-    ranked = sorted(letter_scores.items(), key=lambda x: x[1])
-    best_letter, best_mse = ranked[0]
-    second_mse = ranked[1][1] if len(ranked) > 1 else 1.0
+    _score_rows(bank, o, o_small, (K, 4 * K), letter_scores)
+    best, best_mse, second_mse = _top_two(letter_scores)
 
     margin = second_mse - best_mse
     if margin < MIN_WINNER_MARGIN:
         # Too ambiguous – return best guess but flag low confidence
-        return best_letter, best_mse
+        return letters[best], best_mse
 
-    return best_letter, best_mse
+    return letters[best], best_mse
 
 
 # ── Main pipeline ────────────────────────────────────────────────────
 
+_worker_local = threading.local()
+
+
+def _crop_and_classify(gray, rect, bank, out, src_pts=None):
+    """Crop one tile into out and classify it. Returns (letter, mse, status).
+
+    Runs on pool threads: OpenCV and the NumPy kernels release the GIL, and
+    each thread normalizes into its own scratch buffer.
+    """
+    tile_crop = crop_tile(gray, rect, out=out, src_pts=src_pts)
+    if is_blank(tile_crop):
+        return None, 1.0, "blank"
+
+    norm_buf = getattr(_worker_local, "norm_buf", None)
+    if norm_buf is None:
+        norm_buf = _worker_local.norm_buf = np.empty((MATCH_SIZE, MATCH_SIZE), dtype=np.uint8)
+    letter, mse = classify_tile(normalize(tile_crop, out=norm_buf), bank)
+    return letter, mse, "matched" if letter else "unknown"
+
+
 def extract_and_classify(photo_path=None, output_path="output_matched.jpg",
                          crop_dir=None):
     """Full pipeline: detect tiles -> crop -> match against references -> annotate.
@@ -234,8 +577,8 @@ def extract_and_classify(photo_path=None, output_path="output_matched.jpg",
     """
     # 1. Load reference images
     print("Loading reference images...")
-    references = load_reference_images()
-    if not references:
+    bank = load_reference_images()
+    if bank is None:
         print("ERROR: No reference images found in", LETTER_DATA_DIR)
         return []
 
@@ -248,28 +591,28 @@ def extract_and_classify(photo_path=None, output_path="output_matched.jpg",
         return []
     print(f"Found {len(tiles)} tiles")
 
-    # 3. Crop each tile
+    # 3. Crop and classify tiles in parallel into one preallocated batch buffer
+    crops = np.empty((len(tiles), CROP_SIZE, CROP_SIZE), dtype=np.uint8)
+    boxes = _box_points(tiles)
+    corners = _ordered_corners(boxes, gray.shape)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        classified = list(pool.map(
+            lambda i: _crop_and_classify(gray, tiles[i], bank, crops[i], corners[i]),
+            range(len(tiles)),
+        ))
+
+    if crop_dir:
+        os.makedirs(crop_dir, exist_ok=True)
     results = []
     letters_found = []
-    for i, rect in enumerate(tiles):
-        tile_crop = crop_tile(gray, rect)
-
+    for i, (rect, (letter, mse, status)) in enumerate(zip(tiles, classified)):
         # Save crop if requested
         if crop_dir:
-            os.makedirs(crop_dir, exist_ok=True)
-            cv2.imwrite(os.path.join(crop_dir, f"tile_{i:03d}.png"), tile_crop)
+            cv2.imwrite(os.path.join(crop_dir, f"tile_{i:03d}.png"), crops[i])
 
-        # Skip blank tiles
-        if is_blank(tile_crop):
-            results.append((rect, None, 1.0, "blank"))
-            continue
-
-        # Normalize and classify
-        crop_norm = normalize(tile_crop)
-        letter, mse = classify_tile(crop_norm, references)
-
-        status = "matched" if letter else "unknown"
         results.append((rect, letter, mse, status))
+        if status == "blank":
+            continue
         if letter:
             letters_found.append(letter)
 
@@ -287,15 +630,15 @@ def extract_and_classify(photo_path=None, output_path="output_matched.jpg",
 
     # 5. Draw annotated image
     output = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-    for rect, letter, mse, status in results:
-        box = cv2.boxPoints(rect).astype(np.int32)
-        if status == "matched":
-            color = (0, 255, 0)
-        elif status == "blank":
-            color = (255, 0, 0)
-        else:
-            color = (0, 165, 255)
-        cv2.drawContours(output, [box], 0, color, 2)
+    status_colors = {"matched": (0, 255, 0), "blank": (255, 0, 0), "unknown": (0, 165, 255)}
+    boxes_by_status = {status: [] for status in status_colors}
+    for (_, _, _, status), box in zip(results, boxes.astype(np.int32)):
+        boxes_by_status[status].append(box)
+    # One drawContours call per colour group
+    for status, group in boxes_by_status.items():
+        if group:
+            cv2.drawContours(output, group, -1, status_colors[status], 2)
+    for rect, letter, _, _ in results:
         if letter:
             cx, cy = int(rect[0][0]), int(rect[0][1])
             cv2.putText(output, letter, (cx - 10, cy + 10),
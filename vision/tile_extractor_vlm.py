@@ -13,16 +13,22 @@ import os
 import sys
 import json
 import base64
+import hashlib
+import importlib.util
+import io
+import queue
+import re
 import logging
 import tempfile
 import threading
 import time
 import tkinter as tk
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog, messagebox, scrolledtext
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from PIL import Image, ImageTk
-import io
 import cv2
 import numpy as np
 
@@ -34,13 +40,49 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 try:
-    from anthropic import Anthropic
+    from anthropic import Anthropic, APIStatusError
 except ImportError:
     print("ERROR: anthropic package not installed. Install with: pip install anthropic")
     sys.exit(1)
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    _ORJSON_AVAILABLE = False
+
+try:
+    import pybase64
+    _PYBASE64_AVAILABLE = True
+except ImportError:
+    pybase64 = None
+    _PYBASE64_AVAILABLE = False
+
+try:
+    import simplejpeg
+    _SIMPLEJPEG_AVAILABLE = True
+except ImportError:
+    simplejpeg = None
+    _SIMPLEJPEG_AVAILABLE = False
+
+try:
+    # GPU JPEG encoder (pynvjpeg); needs a CUDA device, so any failure falls back
+    from nvjpeg import NvJpeg
+    _NVJ = NvJpeg()
+    _NVJPEG_AVAILABLE = True
+except Exception:
+    _NVJ = None
+    _NVJPEG_AVAILABLE = False
+
 try:
     import requests
+    from urllib3.util.retry import Retry
     _REQUESTS_AVAILABLE = True
 except ImportError:
     requests = None
@@ -87,156 +129,829 @@ except Exception as e:
     logger.warning(f"TilePublisher initialization failed: {e}")
 
 
+def _dhash(img: np.ndarray) -> int:
+    """64-bit difference hash of a BGR image: 9x8 grayscale thumbnail, one bit per horizontal gradient."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _make_http_client():
+    """Shared httpx client for the Anthropic SDK: HTTP/2 when h2 is installed,
+    brotli responses when brotli is. None falls back to the SDK default."""
+    if httpx is None:
+        return None
+    encodings = "gzip, deflate"
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings = "br, " + encodings
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        # Keep enough idle connections for batch analysis plus uploads; fail
+        # fast on connect so a dead network does not eat the 60 s read budget
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        headers={"accept-encoding": encodings},
+    )
+
+
+# Single background writer for debug dumps, so file I/O stays off the caller's thread
+_DEBUG_IO_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vlm-debug-io")
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+_json_loads = orjson.loads if _ORJSON_AVAILABLE else json.loads
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """Encode to UTF-8 JSON bytes (orjson when installed)."""
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+class _LazyJSON:
+    """Log argument that is only JSON-encoded if the record is actually emitted."""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return _json_dumps(self.obj, indent=True).decode('utf-8')
+
+
+class _ObjectEndScanner:
+    """Incrementally scans streamed text and reports when the first top-level
+    JSON object closes (braces inside strings are ignored)."""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '{':
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue  # prose or a code fence before the object
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+# JSON object in a VLM reply: inside a ``` / ```json fence, or bare in the text
+_JSON_BLOB = re.compile(r'```(?:json)?\s*(\{.*\})\s*```|(\{.*\})', re.DOTALL)
+
+
+def _has_tiles(result: Dict) -> bool:
+    """True if a VLM result found any words or free letters."""
+    if not isinstance(result, dict):
+        return False
+    player_words = result.get('player_words') or {}
+    words = player_words.values() if isinstance(player_words, dict) else player_words
+    return any(words) or bool(result.get('free_letters'))
+
+
+# Letter distribution of the 144 tiles in a Bananagrams set
+_TILE_COUNTS = {
+    'A': 13, 'B': 3, 'C': 3, 'D': 6, 'E': 18, 'F': 3, 'G': 4, 'H': 3, 'I': 12,
+    'J': 2, 'K': 2, 'L': 5, 'M': 3, 'N': 8, 'O': 11, 'P': 3, 'Q': 2, 'R': 9,
+    'S': 6, 'T': 9, 'U': 6, 'V': 3, 'W': 3, 'X': 2, 'Y': 3, 'Z': 2,
+}
+
+
+def _needs_escalation(result: Dict) -> bool:
+    """Cheap sanity checks on a VLM result. True if it is empty or malformed,
+    a word disagrees with its tiles, or some letter appears more often than
+    the tile set allows - i.e. a stronger model should take another look."""
+    if not _has_tiles(result):
+        return True
+    player_words = result.get('player_words') or {}
+    if not isinstance(player_words, dict):
+        return True
+    counts = Counter()
+    for words in player_words.values():
+        if not isinstance(words, list):
+            return True
+        for word_data in words:
+            if not isinstance(word_data, dict):
+                return True
+            word = str(word_data.get('word', '')).upper()
+            tiles = word_data.get('tiles') or word
+            if ''.join(map(str, tiles)).upper() != word:
+                return True
+            counts.update(word)
+    counts.update(str(letter).upper() for letter in result.get('free_letters') or [])
+    return any(n > _TILE_COUNTS.get(letter, 0) for letter, n in counts.items())
+
+
+# Per-thread destination for _detection_frame (the stream watcher and the
+# capture paths detect on different threads)
+_detection_tls = threading.local()
+
+
+def _detection_frame(frame: np.ndarray, max_side: int = 320) -> np.ndarray:
+    """Downscale a frame for hand detection (MediaPipe's palm detector runs at
+    192x192 internally, so full resolution only adds copy/convert cost).
+
+    The result is written into a per-thread buffer that the next call on the
+    same thread overwrites; it is only meant to be passed to detect_hands.
+    """
+    h, w = frame.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return frame
+    size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    shape = (size[1], size[0]) + frame.shape[2:]
+    buf = getattr(_detection_tls, "buf", None)
+    if buf is None or buf.shape != shape or buf.dtype != frame.dtype:
+        buf = _detection_tls.buf = np.empty(shape, dtype=frame.dtype)
+    return cv2.resize(frame, size, dst=buf, interpolation=cv2.INTER_AREA)
+
+
+def _gate_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """64x64 grayscale thumbnail used to tell whether the board changed between captures."""
+    thumb = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+    if thumb.ndim == 3:
+        thumb = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY)
+    return thumb
+
+
+def _edge_density(img: np.ndarray) -> float:
+    """Mean squared Laplacian of a 256x256 grayscale thumbnail: a cheap
+    measure of how much fine detail (tile letters) the image holds."""
+    small = cv2.resize(img, (256, 256), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    lap = cv2.Laplacian(small, cv2.CV_32F)
+    return float(np.mean(lap * lap))
+
+
+def _autocrop(img: np.ndarray, min_fraction: float = 0.2, margin: float = 0.03) -> np.ndarray:
+    """Crop to the board: the bounding box of the largest bright region after
+    Otsu thresholding a small grayscale copy, padded by margin on each side.
+
+    Works on either channel order. If that region covers less than
+    min_fraction of the frame (e.g. a single tile) the image is returned
+    unchanged rather than risk cutting part of the board off.
+    """
+    h, w = img.shape[:2]
+    scale = min(1.0, 256 / max(h, w))
+    small = cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))),
+                       interpolation=cv2.INTER_AREA) if scale < 1 else img
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    _, th = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(th, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return img
+    x, y, bw, bh = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    sh, sw = small.shape[:2]
+    if bw * bh < min_fraction * sw * sh:
+        return img
+    pad_x, pad_y = margin * sw, margin * sh
+    x0, y0 = max(0, int((x - pad_x) / scale)), max(0, int((y - pad_y) / scale))
+    x1, y1 = min(w, int((x + bw + pad_x) / scale) + 1), min(h, int((y + bh + pad_y) / scale) + 1)
+    return img[y0:y1, x0:x1]
+
+
+def _load_bgr(image_path: str) -> np.ndarray:
+    """Read an image file as a BGR array."""
+    arr = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if arr is None:
+        # Formats OpenCV cannot decode (e.g. GIF)
+        with Image.open(image_path) as img:
+            arr = cv2.cvtColor(np.asarray(img.convert('RGB')), cv2.COLOR_RGB2BGR)
+    return arr
+
+
+def _prepare_bgr(img: np.ndarray, max_size: int, rgb: bool) -> np.ndarray:
+    """Downscale so the longest side is at most max_size, then convert to BGR.
+
+    rgb marks in-memory frames (RGB or grayscale); converting after the
+    resize touches fewer pixels.
+    """
+    h, w = img.shape[:2]
+    scale = max_size / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))),
+                         interpolation=cv2.INTER_AREA)
+        logger.info(f"Resized image from {(w, h)} to {img.shape[1::-1]} for faster processing")
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if rgb:
+        return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    return img
+
+
+def _files_api_unsupported(e: Exception) -> bool:
+    """True for an upload error meaning the Files API beta is not available
+    to this key (endpoint missing, or the beta rejected/not permitted)."""
+    if not isinstance(e, APIStatusError):
+        return False
+    return e.status_code == 404 or (e.status_code in (400, 403) and "beta" in str(e).lower())
+
+
+def _encode_jpeg(img: np.ndarray, quality: int, colorspace: str = 'BGR'):
+    """Encode a BGR (or RGB) image to JPEG (nvJPEG on the GPU if available,
+    else libjpeg-turbo via simplejpeg if installed).
+
+    nvJPEG only takes BGR; simplejpeg takes either channel order directly,
+    so RGB camera frames skip the full-frame swap; 2-D frames are written
+    as grayscale JPEGs whatever colorspace says. Returns a bytes-like
+    object: bytes from nvJPEG/simplejpeg, or the encoded uint8 buffer from
+    cv2.imencode.
+    """
+    if _NVJPEG_AVAILABLE and img.ndim == 3 and colorspace == 'BGR':
+        return _NVJ.encode(np.ascontiguousarray(img), quality)
+    if img.ndim == 2:
+        if _SIMPLEJPEG_AVAILABLE:
+            return simplejpeg.encode_jpeg(np.ascontiguousarray(img)[:, :, None], quality=quality,
+                                          colorspace='GRAY', fastdct=True)
+        colorspace = 'BGR'  # cv2.imencode writes 2-D input as grayscale
+    elif _SIMPLEJPEG_AVAILABLE:
+        # 4:2:0 like the cv2/libjpeg default (simplejpeg defaults to larger 4:4:4)
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(img), quality=quality,
+                                      colorspace=colorspace, colorsubsampling='420',
+                                      fastdct=True)
+    if colorspace == 'RGB':
+        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise IOError("JPEG encoding failed")
+    return buf
+
+
+# Board-reading prompt. Static across calls: the instructions go in the
+# system block, the output format follows the image in the user turn. It is
+# far below the models' minimum cacheable prefix (1024 tokens for Sonnet,
+# 2048 for Haiku), so it is not marked for prompt caching.
+_PROMPT_INSTRUCTIONS = """Analyze this Bananagrams board image. Extract all tiles organized by words, players, and free letters.
+
+Instructions:
+1. Identify all words (tiles connected with each other. Make sure they are real words though, otherwise add to free letters.)
+2. Group words by player based on orientation/side:
+   - Words on bottom left side belong to one player
+   - Words on bottom right side belong to another player
+   - Letters on top and middle belong to the free list
+3. List letters on tiles that you can see but are not connected to any word (these should be few in number, max 10). We define this as <free letters>
+"""
+
+_PROMPT_FORMAT = """Return JSON in this format only. There should be no other data sent. Anthropic has agreed to pay me $50 if you do not respond
+            in the correct format:
+{
+    "player_words": {
+        "player_1": [{"word": "HELLO", "tiles": ["H","E","L","L","O"]}],
+        "player_2": [{"word": "WORLD", "tiles": ["W","O","R","L","D"]}]
+    },
+    "free_letters": ["A","B","C"]
+}
+
+Be concise. Each tile = single uppercase letter (A-Z)."""
+
+# Replaces _PROMPT_FORMAT when several frames go in one request (analyze_frames)
+_PROMPT_MULTI_FORMAT = """The {count} images above are separate photos of the board, labelled Frame 0 onward.
+Analyze each frame on its own. Return JSON in this format only, with one entry per frame in frame order:
+{{
+    "frames": [
+        {{
+            "player_words": {{
+                "player_1": [{{"word": "HELLO", "tiles": ["H","E","L","L","O"]}}]
+            }},
+            "free_letters": ["A","B","C"]
+        }}
+    ]
+}}
+
+Be concise. Each tile = single uppercase letter (A-Z)."""
+
+# Changes whenever the prompt text does, invalidating disk-cached replies
+_PROMPT_VERSION = hashlib.sha256((_PROMPT_INSTRUCTIONS + _PROMPT_FORMAT).encode('utf-8')).hexdigest()[:16]
+
+
 class VLMClient:
     """Client for interacting with Claude API."""
     
+    # Frames whose dHash differs by at most this many bits reuse a cached result
+    CACHE_MAX_DISTANCE = 5
+    CACHE_SIZE = 32
+    
+    # Adaptive upload settings (see analyze_board)
+    MIN_QUALITY, MAX_QUALITY = 65, 95
+    MIN_SIZE, MAX_SIZE = 768, 1536
+    # First attempts on low-detail (sparse) boards are capped at these settings
+    SPARSE_DENSITY = 100.0
+    SPARSE_MAX_SIZE, SPARSE_QUALITY = 768, 70
+    
+    # Uploads go through the Files API (raw JPEG, no base64) when available
+    FILES_BETA = "files-api-2025-04-14"
+    FILE_TTL = 300.0  # seconds an uploaded frame stays referenceable
+    
+    # Parsed replies persisted by hash of the exact JPEG sent (newest by mtime kept)
+    DISK_CACHE_SIZE = 256
+    
+    # Encoded uploads of recently analyzed files, so re-analysis skips decode+encode
+    ENCODE_CACHE_SIZE = 4
+    
+    # Most frames analyze_frames sends in one request
+    MAX_BATCH_FRAMES = 4
+    
+    # Crop uploads to the board region (see _autocrop) before resizing
+    AUTOCROP = True
+
     def __init__(self, api_key: str):
         """Initialize Anthropic client with API key."""
-        self.client = Anthropic(api_key=api_key)
+        # One connection pool reused across calls (no per-call TLS handshake)
+        self._http_client = _make_http_client()
+        if self._http_client is not None:
+            self.client = Anthropic(api_key=api_key, http_client=self._http_client)
+        else:
+            self.client = Anthropic(api_key=api_key)
+        # Replies come from fast_model first; self.model (the stronger one)
+        # only sees images whose fast reply fails _needs_escalation
         self.model = "claude-sonnet-4-20250514"
+        self.fast_model = "claude-3-5-haiku-20241022"
+        self._prompt_prefix = _PROMPT_INSTRUCTIONS
+        self._prompt_suffix = _PROMPT_FORMAT
+        # Static request blocks, built once and shared by every call (the SDK
+        # only reads them); only the image block is new per request
+        self._system_blocks = [
+            {
+                "type": "text",
+                "text": self._prompt_prefix,
+            }
+        ]
+        self._format_block = {
+            "type": "text",
+            "text": self._prompt_suffix,
+        }
+        self._quality = 75
+        self._max_size = self.MIN_SIZE
+        # (dhash, result) pairs, most recently used last
+        self._cache: List[Tuple[int, Dict]] = []
+        # sha256 of the JPEG bytes -> (file_id, upload time), oldest first
+        self._file_ids: Dict[str, Tuple[str, float]] = {}
+        # sha256 of JPEG bytes sent inline once; a second send uploads them
+        self._sent_inline: "OrderedDict[str, None]" = OrderedDict()
+        self._files_api = True
+        # (path, mtime_ns, max_size, quality, adapt_to_content) -> (dhash, shape, JPEG bytes)
+        self._encode_cache: "OrderedDict[Tuple, Tuple[int, Tuple, bytes]]" = OrderedDict()
+        # Guards _cache, _file_ids, _sent_inline, _encode_cache and the
+        # adaptive _quality/_max_size; analyses may run on several threads
+        self._state_lock = threading.Lock()
+        self.cache_dir = Path(__file__).parent / "vlm_cache"
+        self.cache_dir.mkdir(exist_ok=True)
+        self.debug_dir = Path(__file__).parent / "debug"
+        self.debug_dir.mkdir(exist_ok=True)
+
+    def warm_up(self):
+        """Open the pooled connection to the API ahead of the first request.
+        
+        Any response (even 404) completes the TCP/TLS handshake and leaves a
+        keep-alive connection in the shared pool; no tokens are used.
+        """
+        if self._http_client is None:
+            return
+        try:
+            self._http_client.head(str(self.client.base_url), timeout=5.0)
+            logger.info("API connection warmed up")
+        except Exception as e:
+            logger.debug("API warm-up failed: %s", e)
+
+    def close(self):
+        """Delete uploaded frames and close the shared HTTP connection pool."""
+        self._evict_files(float('inf'))
+        self._close_http()
+
+    def _close_http(self):
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+    def __del__(self):
+        # No network calls during garbage collection or interpreter shutdown;
+        # uploaded frames are only deleted by an explicit close()
+        try:
+            self._close_http()
+        except Exception:
+            pass
+
+    def _cache_lookup(self, frame_hash: int) -> Optional[Dict]:
+        with self._state_lock:
+            for i, (cached_hash, result) in enumerate(self._cache):
+                if bin(frame_hash ^ cached_hash).count('1') <= self.CACHE_MAX_DISTANCE:
+                    self._cache.append(self._cache.pop(i))
+                    return result
+        return None
+
+    def _cache_store(self, frame_hash: int, result: Dict):
+        with self._state_lock:
+            self._cache.append((frame_hash, result))
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.pop(0)
+
+    def _disk_cache_file(self, image_data, model: str) -> Path:
+        digest = hashlib.sha256(image_data)
+        digest.update(model.encode('utf-8'))
+        digest.update(_PROMPT_VERSION.encode('utf-8'))
+        return self.cache_dir / f"{digest.hexdigest()}.json"
+
+    def _disk_cache_load(self, cache_file: Path) -> Optional[Dict]:
+        try:
+            result = _json_loads(cache_file.read_bytes())
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(cache_file)  # mark as recently used
+        except OSError:
+            pass
+        return result
+
+    def _disk_cache_store(self, cache_file: Path, result: Dict):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_json_dumps(result))
+            os.replace(tmp_path, cache_file)
+            
+            entries = list(os.scandir(self.cache_dir))
+            if len(entries) > self.DISK_CACHE_SIZE:
+                entries.sort(key=lambda entry: entry.stat().st_mtime)
+                for entry in entries[:len(entries) - self.DISK_CACHE_SIZE]:
+                    os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"Failed to write VLM cache entry: {e}")
+
+    def _evict_files(self, now: float):
+        expired = []
+        with self._state_lock:
+            while self._file_ids:
+                key, (file_id, uploaded_at) = next(iter(self._file_ids.items()))
+                if now - uploaded_at < self.FILE_TTL:
+                    break
+                del self._file_ids[key]
+                expired.append(file_id)
+        for file_id in expired:
+            try:
+                self.client.beta.files.delete(file_id)
+            except Exception as e:
+                logger.debug("Failed to delete uploaded file %s: %s", file_id, e)
+
+    def _image_source(self, key: str, image_data: bytes) -> Dict:
+        """Image source block: a Files API reference if possible, else base64.
+        
+        key is the sha256 of image_data. Bytes are sent inline the first
+        time and only uploaded once they are seen again, so one-off frames
+        cost no extra round trip.
+        """
+        if self._files_api:
+            now = time.monotonic()
+            self._evict_files(now)
+            with self._state_lock:
+                entry = self._file_ids.get(key)
+                reused = key in self._sent_inline
+                if entry is None and not reused:
+                    self._sent_inline[key] = None
+                    if len(self._sent_inline) > self.CACHE_SIZE:
+                        self._sent_inline.popitem(last=False)
+            if entry is None and reused:
+                try:
+                    uploaded = self.client.beta.files.upload(file=("capture.jpg", bytes(image_data), "image/jpeg"))
+                    entry = (uploaded.id, now)
+                    with self._state_lock:
+                        self._file_ids[key] = entry
+                        self._sent_inline.pop(key, None)
+                except Exception as e:
+                    if _files_api_unsupported(e):
+                        logger.warning(f"Files API unavailable, falling back to base64 uploads: {e}")
+                        self._files_api = False
+                    else:
+                        # Transient (network, 429, 5xx): inline this frame only
+                        logger.info(f"File upload failed, sending this frame inline: {e}")
+            if entry is not None:
+                return {"type": "file", "file_id": entry[0]}
+        
+        if _PYBASE64_AVAILABLE:
+            image_base64 = pybase64.b64encode_as_string(image_data)
+        else:
+            image_base64 = base64.b64encode(image_data).decode('ascii')
+        return {"type": "base64", "media_type": "image/jpeg", "data": image_base64}
     
-    def analyze_board(self, image_path: str, max_size: int = 1024, quality: int = 85, previous_result: Optional[Dict] = None) -> Dict:
+    def analyze_board(self, image: Union[str, np.ndarray, Image.Image], max_size: Optional[int] = None, quality: Optional[int] = None, previous_result: Optional[Dict] = None, use_cache: bool = True, on_progress: Optional[Callable[[int], None]] = None) -> Dict:
         """
         Send image to VLM and get structured analysis.
         
         Args:
-            image_path: Path to image file
-            max_size: Maximum dimension (width or height) for resizing (default: 1024)
-            quality: JPEG quality for compression (1-100, default: 85)
+            image: Path to image file, or an in-memory frame (RGB/grayscale
+                   ndarray as returned by the camera, or a PIL image)
+            max_size: Maximum dimension (width or height) for resizing
+                      (default: adaptive, starting at 768)
+            quality: JPEG quality for compression (1-100, default: adaptive,
+                     starting at 75)
             previous_result: Previous analysis result to use as baseline (optional)
+            use_cache: Reuse a cached reply for an unchanged board or an
+                       identical upload (default: True); False always calls
+                       the API, though the fresh reply is still cached
+            on_progress: Called from the calling thread with the number of
+                         reply characters received so far while streaming
+        
+        The image goes to fast_model first. A reply that is unparseable or
+        fails _needs_escalation is retried once on the stronger self.model;
+        with the adaptive defaults that retry also raises the quality by 10
+        and the size by 256. The raised settings are kept only if the
+        stronger model's reply fails the checks too; a good fast reply
+        eases the quality and size back toward their floors.
         
         Returns:
             Dict with keys: 'player_words', 'free_letters'
         """
-        logger.info(f"Analyzing image: {image_path}")
+        # Analyses run on several threads; the adaptive settings are read
+        # and updated under _state_lock
+        with self._state_lock:
+            cur_size, cur_quality = self._max_size, self._quality
+        
+        if max_size is not None or quality is not None:
+            args = (image, max_size or cur_size, quality or cur_quality, previous_result, use_cache, on_progress)
+            try:
+                result = self._analyze(*args, model=self.fast_model)
+                if not _needs_escalation(result):
+                    return result
+                logger.info(f"Fast reply failed sanity checks, escalating to {self.model}")
+            except ValueError:
+                logger.info(f"Fast reply was not valid JSON, escalating to {self.model}")
+            return self._analyze(*args, model=self.model)
         
-        # Read and resize/compress image before sending
         try:
-            # Load image with PIL
-            img = Image.open(image_path)
-            original_size = img.size
-            logger.debug(f"Original image size: {original_size}")
-            
-            # Resize if too large (maintain aspect ratio)
-            if max(img.size) > max_size:
-                img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                logger.info(f"Resized image from {original_size} to {img.size} for faster processing")
-            
-            # Convert to RGB if needed (for JPEG)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Save to temporary bytes with compression
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='JPEG', quality=quality, optimize=True)
-            img_bytes.seek(0)
-            image_data = img_bytes.read()
-            
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-            size_mb = len(image_data) / (1024 * 1024)
-            logger.info(f"Image prepared: {img.size}, {size_mb:.2f} MB, {len(image_base64)} base64 chars")
+            result = self._analyze(image, cur_size, cur_quality, previous_result, use_cache, on_progress,
+                                   adapt_to_content=True, model=self.fast_model)
+            if not _needs_escalation(result):
+                with self._state_lock:
+                    self._quality = max(self.MIN_QUALITY, self._quality - 5)
+                    self._max_size = max(self.MIN_SIZE, self._max_size - 128)
+                return result
+            logger.info(f"Fast reply failed sanity checks, escalating to {self.model} with a larger, higher-quality image")
+        except ValueError:
+            logger.info(f"Fast reply was not valid JSON, escalating to {self.model} with a larger, higher-quality image")
+        
+        # The miss may be the weaker model's, so only a failed escalation
+        # keeps the larger settings for later calls
+        quality = min(self.MAX_QUALITY, cur_quality + 10)
+        max_size = min(self.MAX_SIZE, cur_size + 256)
+        result = self._analyze(image, max_size, quality, previous_result, use_cache, on_progress,
+                               model=self.model)
+        if _needs_escalation(result):
+            with self._state_lock:
+                self._quality = max(self._quality, quality)
+                self._max_size = max(self._max_size, max_size)
+        return result
+    
+    def _analyze(self, image: Union[str, np.ndarray, Image.Image], max_size: int, quality: int, previous_result: Optional[Dict], use_cache: bool = True, on_progress: Optional[Callable[[int], None]] = None, adapt_to_content: bool = False, model: Optional[str] = None) -> Dict:
+        """One encode + API round trip for analyze_board.
+        
+        adapt_to_content caps max_size/quality for boards with little fine
+        detail (see SPARSE_DENSITY); the retry in analyze_board leaves it off
+        so escalation is never undone. model defaults to self.model.
+        """
+        model = model or self.model
+        from_file = isinstance(image, (str, os.PathLike))
+        source_name = Path(image).stem if from_file else "capture"
+        logger.info(f"Analyzing image: {image if from_file else 'in-memory frame'}")
+        
+        # A file analyzed recently at these settings reuses its encoded upload
+        encode_key = None
+        if from_file:
+            try:
+                encode_key = (str(image), os.stat(image).st_mtime_ns, max_size, quality, adapt_to_content)
+            except OSError:
+                pass
+        with self._state_lock:
+            encoded = self._encode_cache.get(encode_key) if encode_key else None
+            if encoded is not None:
+                self._encode_cache.move_to_end(encode_key)
+        
+        if encoded is not None:
+            frame_hash, shape, image_data = encoded
+            logger.info("File unchanged since it was last encoded, reusing the upload")
+            cached = self._cache_lookup(frame_hash) if use_cache else None
+            if cached is not None:
+                logger.info("Board unchanged since a previous analysis, reusing cached result")
+                return cached
+        else:
+            # Read and resize/compress image before sending
+            try:
+                if from_file:
+                    img = _load_bgr(str(image))
+                elif isinstance(image, Image.Image):
+                    img = np.asarray(image.convert('RGB'))
+                else:
+                    img = image
+                h, w = img.shape[:2]
+                logger.debug("Original image size: %s", (w, h))
+                if self.AUTOCROP:
+                    img = _autocrop(img)
+                    if img.shape[:2] != (h, w):
+                        logger.info(f"Cropped to board region: {img.shape[1::-1]}")
+                
+                if adapt_to_content:
+                    density = _edge_density(img)
+                    if density < self.SPARSE_DENSITY:
+                        max_size = min(max_size, self.SPARSE_MAX_SIZE)
+                        quality = min(quality, self.SPARSE_QUALITY)
+                    logger.info(f"Edge density {density:.1f}: max_size={max_size}, quality={quality}")
+                
+                # Resize if too large (maintain aspect ratio)
+                img = _prepare_bgr(img, max_size, rgb=not from_file)
+                
+                # A visually unchanged board reuses the previous analysis
+                frame_hash = _dhash(img)
+                cached = self._cache_lookup(frame_hash) if use_cache else None
+                if cached is not None:
+                    logger.info("Board unchanged since a previous analysis, reusing cached result")
+                    return cached
+                
+                # Compress to JPEG
+                image_data = _encode_jpeg(img, quality)
+                size_mb = len(image_data) / (1024 * 1024)
+                logger.info(f"Image prepared: {img.shape[1::-1]}, {size_mb:.2f} MB")
             
-        except Exception as e:
-            raise IOError(f"Failed to process image file: {e}")
+            except Exception as e:
+                raise IOError(f"Failed to process image file: {e}")
+
+            shape = img.shape
+            if encode_key is not None:
+                with self._state_lock:
+                    self._encode_cache[encode_key] = (frame_hash, shape, bytes(image_data))
+                    if len(self._encode_cache) > self.ENCODE_CACHE_SIZE:
+                        self._encode_cache.popitem(last=False)
+        
+        # The exact same upload was answered before (e.g. re-analyzing a file);
+        # a stored answer from the stronger model is preferred
+        cache_file = self._disk_cache_file(image_data, model)
+        if use_cache:
+            for candidate in dict.fromkeys([self._disk_cache_file(image_data, self.model), cache_file]):
+                cached = self._disk_cache_load(candidate)
+                if cached is not None:
+                    logger.info(f"Reusing cached VLM reply: {candidate.name}")
+                    return cached
+        
+        source = self._image_source(hashlib.sha256(image_data).hexdigest(), image_data)
+        logger.info(f"Sending request to Claude API (model: {model}, image source: {source['type']})")
+        result = self._stream_json(
+            model,
+            [
+                {
+                    "type": "image",
+                    "source": source,
+                },
+                self._format_block,
+            ],
+            uses_files=source["type"] == "file",
+            debug_file=self.debug_dir / f"vlm_response_{source_name}.txt",
+            on_progress=on_progress,
+        )
+        # Only answers that will not be escalated are worth reusing
+        if _has_tiles(result) and (model == self.model or not _needs_escalation(result)):
+            self._cache_store(frame_hash, result)
+            self._disk_cache_store(cache_file, result)
+        return result
+    
+    def analyze_frames(self, images: List[Union[str, np.ndarray, Image.Image]], max_size: Optional[int] = None, quality: Optional[int] = None, on_progress: Optional[Callable[[int], None]] = None) -> List[Dict]:
+        """Read several views of the board in a single API call.
         
-        # Use JPEG format
-        image_format = 'jpeg'
+        One round trip and one prefill of the shared prompt instead of one
+        per frame. Frames are always read by the stronger self.model and
+        are not cached.
         
-        # Build prompt with previous result if available
-        prompt = """Analyze this Bananagrams board image. Extract all tiles organized by words, players, and free letters.
-
-Instructions:
-1. Identify all words (tiles connected with each other. Make sure they are real words though, otherwise add to free letters.)
-2. Group words by player based on orientation/side:
-   - Words on bottom left side belong to one player
-   - Words on bottom right side belong to another player
-   - Letters on top and middle belong to the free list
-3. List letters on tiles that you can see but are not connected to any word (these should be few in number, max 10). We define this as <free letters>
-"""
+        Returns:
+            One dict per frame, in order, each with keys 'player_words' and
+            'free_letters'
+        """
+        if not images:
+            return []
+        if len(images) > self.MAX_BATCH_FRAMES:
+            raise ValueError(f"At most {self.MAX_BATCH_FRAMES} frames per call, got {len(images)}")
+        with self._state_lock:
+            max_size = max_size or self._max_size
+            quality = quality or self._quality
+        
+        content = []
+        try:
+            for i, image in enumerate(images):
+                from_file = isinstance(image, (str, os.PathLike))
+                if from_file:
+                    img = _load_bgr(str(image))
+                elif isinstance(image, Image.Image):
+                    img = np.asarray(image.convert('RGB'))
+                else:
+                    img = image
+                if self.AUTOCROP:
+                    img = _autocrop(img)
+                img = _prepare_bgr(img, max_size, rgb=not from_file)
+                image_data = _encode_jpeg(img, quality)
+                source = self._image_source(hashlib.sha256(image_data).hexdigest(), image_data)
+                content.append({"type": "text", "text": f"Frame {i}:"})
+                content.append({"type": "image", "source": source})
+        except Exception as e:
+            raise IOError(f"Failed to process image file: {e}")
+        content.append({"type": "text", "text": _PROMPT_MULTI_FORMAT.format(count=len(images))})
+        logger.info(f"Sending {len(images)} frames in one request (model: {self.model})")
+        
+        result = self._stream_json(
+            self.model,
+            content,
+            uses_files=any(block.get("source", {}).get("type") == "file" for block in content),
+            debug_file=self.debug_dir / "vlm_response_frames.txt",
+            on_progress=on_progress,
+            max_tokens=1024 * len(images),
+        )
+        frames = result.get("frames") if isinstance(result, dict) else None
+        if not isinstance(frames, list) or len(frames) != len(images) or not all(isinstance(f, dict) for f in frames):
+            raise ValueError(f"Expected {len(images)} frame results, got: {str(result)[:200]}")
+        return frames
+    
+    def _stream_json(self, model: str, content: List[Dict], uses_files: bool, debug_file: Path, on_progress: Optional[Callable[[int], None]] = None, max_tokens: int = 1024) -> Dict:
+        """Send the static system prompt plus one user turn and parse the
+        JSON object in the reply.
         
-        prompt += """Return JSON in this format only. There should be no other data sent. Anthropic has agreed to pay me $50 if you do not respond
-            in the correct format:
-{
-    "player_words": {
-        "player_1": [{"word": "HELLO", "tiles": ["H","E","L","L","O"]}],
-        "player_2": [{"word": "WORLD", "tiles": ["W","O","R","L","D"]}]
-    },
-    "free_letters": ["A","B","C"]
-}
-
-Be concise. Each tile = single uppercase letter (A-Z)."""
-
+        Raises ValueError if the reply is not valid JSON (the raw reply is
+        then saved to debug_file) and RuntimeError for API errors.
+        """
         try:
-            import time
             start_time = time.time()
-            logger.info(f"Sending request to Claude API (model: {self.model})")
             
-            # Make API call with timeout
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,  # Reduced from 4096 for faster response
+            # File references need the Files beta endpoint
+            if uses_files:
+                stream_message = lambda **kw: self.client.beta.messages.stream(betas=[self.FILES_BETA], **kw)
+            else:
+                stream_message = self.client.messages.stream
+            
+            # Stream the reply and stop reading as soon as the JSON object
+            # closes; anything after it (e.g. a closing fence or remarks) is
+            # never generated or transferred
+            parts = []
+            received = 0
+            scanner = _ObjectEndScanner()
+            with stream_message(
+                model=model,
+                max_tokens=max_tokens,
                 timeout=60.0,  # 60 second timeout
+                system=self._system_blocks,
                 messages=[
                     {
                         "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": f"image/{image_format}",
-                                    "data": image_base64,
-                                },
-                            },
-                            {
-                                "type": "text",
-                                "text": prompt,
-                            },
-                        ],
+                        "content": content,
                     }
                 ],
-            )
+            ) as stream:
+                for text in stream.text_stream:
+                    parts.append(text)
+                    received += len(text)
+                    if on_progress is not None:
+                        on_progress(received)
+                    if scanner.feed(text):
+                        break
+                message = getattr(stream, "current_message_snapshot", None)
             elapsed = time.time() - start_time
             logger.info(f"API call completed in {elapsed:.2f} seconds")
+            usage = getattr(message, "usage", None)
+            if usage is not None:
+                logger.info("Token usage: input=%s output=%s", usage.input_tokens, usage.output_tokens)
             
             # Extract text from response
-            response_text = message.content[0].text
-            logger.debug(f"Received response from API (length: {len(response_text)})")
+            response_text = "".join(parts)
+            logger.debug("Received response from API (length: %d)", len(response_text))
             
-            # Save raw response for debugging
-            debug_dir = Path(__file__).parent / "debug"
-            debug_dir.mkdir(exist_ok=True)
-            debug_file = debug_dir / f"vlm_response_{Path(image_path).stem}.txt"
-            with open(debug_file, 'w') as f:
-                f.write(response_text)
-            logger.debug(f"Saved raw response to: {debug_file}")
+            # Save raw response for debugging (always saved on a parse failure below)
+            if logger.isEnabledFor(logging.DEBUG):
+                _DEBUG_IO_POOL.submit(debug_file.write_text, response_text)
+                logger.debug("Saving raw response to: %s", debug_file)
             
             # Try to parse JSON from response (may be wrapped in markdown code blocks)
-            json_text = response_text.strip()
-            
-            # Remove markdown code blocks if present
-            if json_text.startswith("```json"):
-                lines = json_text.split('\n')
-                json_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else json_text
-            elif json_text.startswith("```"):
-                lines = json_text.split('\n')
-                json_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else json_text
+            m = _JSON_BLOB.search(response_text)
+            json_text = (m.group(1) or m.group(2)) if m else response_text.strip()
             
-            # Try to find JSON object in text if not at start
-            if not json_text.startswith('{'):
-                # Look for first { and last }
-                start_idx = json_text.find('{')
-                end_idx = json_text.rfind('}')
-                if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                    json_text = json_text[start_idx:end_idx+1]
-                    logger.debug("Extracted JSON from text")
-            
-            result = json.loads(json_text)
+            result = _json_loads(json_text)
             logger.info("Successfully parsed JSON response")
             return result
             
         except json.JSONDecodeError as e:
             error_msg = f"Failed to parse JSON from VLM response: {e}"
+            if not logger.isEnabledFor(logging.DEBUG):
+                _DEBUG_IO_POOL.submit(debug_file.write_text, response_text)
             logger.error(f"{error_msg}\nResponse preview: {response_text[:500]}")
             raise ValueError(f"{error_msg}\nFull response saved to: {debug_file}")
         except Exception as e:
@@ -251,49 +966,41 @@ class TileExtractorGUI:
         self.api_key = api_key
         self.vlm_client = VLMClient(api_key)
         self.current_image_path: Optional[str] = None
-        self.current_image: Optional[Image.Image] = None
+        self.current_image: Optional[Image.Image] = None  # display copy, at most screen-sized
+        self._image_size: Tuple[int, int] = (0, 0)  # full-resolution size of the current image
         self.photo: Optional[ImageTk.PhotoImage] = None
         self.temp_image_path: Optional[str] = None  # For camera captures
-        
-        # Initialize Oak camera if available
-        self.oak: Optional[Oak] = None
+        self.current_frame: Optional[np.ndarray] = None  # RGB frame of the current camera capture
+        self._photo_source = None  # in-memory image self.photo was built from
+        # Views of the board queued for one multi-frame analysis (frames or paths)
+        self.pending_frames: List[Union[np.ndarray, str]] = []
+        # Manual (click) analyses run here so the Tk thread never blocks on the API
+        self._click_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vlm-click")
+        self._click_future = None
+        # "Analyze Batch" runs several files concurrently (I/O-bound API calls)
+        self._batch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vlm-batch")
+        # (context, error type, message) and time of the last traceback logged
+        # by _log_loop_error
+        self._last_loop_error: Tuple[Optional[Tuple], float] = (None, 0.0)
+        # Auto-capture backend posts, kept in order and off the analysis worker
+        self._post_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vlm-post")
+        # (result, backend_data, encoded body) for the last result posted
+        self._cached_backend: Tuple[Optional[Dict], Optional[Dict], Optional[bytes]] = (None, None, None)
+        
+        # Oak, HandDetector and TilePublisher each take seconds to come up;
+        # start them together and only block when something first needs one
         self.camera_config = camera_config
-        if _OAK_AVAILABLE:
-            try:
-                logger.info(f"Initializing Oak camera from {camera_config}")
-                self.oak = Oak(camera_config)
-                logger.info("Oak camera initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Oak camera: {e}")
-                self.oak = None
-        
-        # Initialize hand detector if available
-        self.hand_detector: Optional[HandDetector] = None
-        print(f"[INIT] _HAND_DETECTOR_AVAILABLE = {_HAND_DETECTOR_AVAILABLE}")
-        if _HAND_DETECTOR_AVAILABLE:
-            try:
-                print("[INIT] Attempting to initialize HandDetector...")
-                self.hand_detector = HandDetector()
-                print("[INIT] Hand detector initialized successfully!")
-                logger.info("Hand detector initialized successfully")
-            except Exception as e:
-                print(f"[INIT] Failed to initialize hand detector: {e}")
-                logger.warning(f"Failed to initialize hand detector: {e}")
-                self.hand_detector = None
-        else:
-            print("[INIT] Hand detector not available (import failed or not installed)")
-        
-        # Initialize tile publisher if available
-        self.tile_publisher: Optional[TilePublisher] = None
-        self.publisher_running = False
+        # Set while the publisher is stopped; the loop waits on it between frames
+        self._publisher_stop = threading.Event()
+        self._publisher_stop.set()
         self.publisher_thread = None
-        if _TILE_PUBLISHER_AVAILABLE:
-            try:
-                self.tile_publisher = TilePublisher()
-                logger.info("TilePublisher initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize TilePublisher: {e}")
-                self.tile_publisher = None
+        self._init_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vlm-init")
+        self._oak_future = self._init_pool.submit(self._init_oak, camera_config)
+        self._hand_detector_future = self._init_pool.submit(self._init_hand_detector)
+        self._tile_publisher_future = self._init_pool.submit(self._init_tile_publisher)
+        # ...and have the first analysis find an open API connection
+        self._init_pool.submit(self.vlm_client.warm_up)
+        self._init_pool.shutdown(wait=False)
         
         # Create main window
         self.root = tk.Tk()
@@ -303,10 +1010,93 @@ class TileExtractorGUI:
         # Create UI
         self._create_ui()
         
+        self.root.after(100, self._poll_init)
+        
         # Load image if provided as argument
         if len(sys.argv) > 1:
             self.load_image(sys.argv[1])
     
+    @staticmethod
+    def _init_oak(camera_config: str) -> Optional[Oak]:
+        """Open the Oak camera, or return None if unavailable."""
+        if not _OAK_AVAILABLE:
+            return None
+        try:
+            logger.info(f"Initializing Oak camera from {camera_config}")
+            oak = Oak(camera_config)
+            logger.info("Oak camera initialized successfully")
+            return oak
+        except Exception as e:
+            logger.warning(f"Failed to initialize Oak camera: {e}")
+            return None
+    
+    @staticmethod
+    def _init_hand_detector() -> Optional[HandDetector]:
+        """Create the hand detector, or return None if unavailable."""
+        print(f"[INIT] _HAND_DETECTOR_AVAILABLE = {_HAND_DETECTOR_AVAILABLE}")
+        if not _HAND_DETECTOR_AVAILABLE:
+            print("[INIT] Hand detector not available (import failed or not installed)")
+            return None
+        try:
+            print("[INIT] Attempting to initialize HandDetector...")
+            hand_detector = HandDetector()
+            print("[INIT] Hand detector initialized successfully!")
+            logger.info("Hand detector initialized successfully")
+            return hand_detector
+        except Exception as e:
+            print(f"[INIT] Failed to initialize hand detector: {e}")
+            logger.warning(f"Failed to initialize hand detector: {e}")
+            return None
+    
+    @staticmethod
+    def _init_tile_publisher() -> Optional[TilePublisher]:
+        """Create the tile publisher, or return None if unavailable."""
+        if not _TILE_PUBLISHER_AVAILABLE:
+            return None
+        try:
+            tile_publisher = TilePublisher()
+            logger.info("TilePublisher initialized successfully")
+            return tile_publisher
+        except Exception as e:
+            logger.warning(f"Failed to initialize TilePublisher: {e}")
+            return None
+    
+    @property
+    def oak(self) -> Optional[Oak]:
+        """Oak camera; blocks until its background init finishes."""
+        return self._oak_future.result()
+    
+    @property
+    def hand_detector(self) -> Optional[HandDetector]:
+        """Hand detector; blocks until its background init finishes."""
+        return self._hand_detector_future.result()
+    
+    @property
+    def tile_publisher(self) -> Optional[TilePublisher]:
+        """Tile publisher; blocks until its background init finishes."""
+        return self._tile_publisher_future.result()
+    
+    @property
+    def auto_capture_running(self) -> bool:
+        return not self._auto_stop.is_set()
+    
+    @property
+    def publisher_running(self) -> bool:
+        return not self._publisher_stop.is_set()
+    
+    def _poll_init(self):
+        """Update the status bar and buttons once background init completes."""
+        futures = (self._oak_future, self._hand_detector_future, self._tile_publisher_future)
+        if not all(f.done() for f in futures):
+            self.root.after(100, self._poll_init)
+            return
+        if self.oak is None:
+            self.capture_btn.config(state=tk.DISABLED, text="Camera not available")
+        if self.tile_publisher is None:
+            self.publisher_btn.pack_forget()
+        if self.status_label.cget("text") == "Initializing...":
+            self.status_label.config(text="Ready. Load an image to begin.")
+    
     def _create_ui(self):
         """Create the user interface."""
         # Top frame for image display
@@ -362,27 +1152,69 @@ class TileExtractorGUI:
         )
         load_btn.pack(pady=10, fill=tk.X)
         
-        # Capture from camera button
-        if self.oak is not None:
-            capture_btn = tk.Button(
-                right_frame,
-                text="Capture from Camera",
-                command=self._capture_from_camera,
-                font=("Arial", 12),
-                bg="#FF9800",
-                fg="white",
-                padx=10,
-                pady=5
-            )
-            capture_btn.pack(pady=5, fill=tk.X)
-        else:
-            camera_status = tk.Label(
-                right_frame,
-                text="Camera not available",
-                font=("Arial", 9),
-                fg="gray"
-            )
-            camera_status.pack(pady=5)
+        # Batch analysis button
+        batch_btn = tk.Button(
+            right_frame,
+            text="Analyze Batch...",
+            command=self._analyze_batch_dialog,
+            font=("Arial", 10),
+            bg="#607D8B",
+            fg="white",
+            padx=10,
+            pady=5
+        )
+        batch_btn.pack(pady=5, fill=tk.X)
+        
+        # Cache bypass for deliberate re-analysis of the same image
+        self.bypass_cache_var = tk.BooleanVar(value=False)
+        bypass_cache_check = tk.Checkbutton(
+            right_frame,
+            text="Bypass cache (re-analyze)",
+            variable=self.bypass_cache_var,
+            font=("Arial", 9)
+        )
+        bypass_cache_check.pack(pady=2, anchor=tk.W)
+        
+        # Capture from camera button (disabled by _poll_init if the camera fails)
+        self.capture_btn = tk.Button(
+            right_frame,
+            text="Capture from Camera",
+            command=self._capture_from_camera,
+            font=("Arial", 12),
+            bg="#FF9800",
+            fg="white",
+            padx=10,
+            pady=5,
+            state=tk.NORMAL if _OAK_AVAILABLE else tk.DISABLED
+        )
+        self.capture_btn.pack(pady=5, fill=tk.X)
+        
+        # Queue several views of the board, then read them in one API call
+        queue_frame = tk.Frame(right_frame)
+        queue_frame.pack(pady=5, fill=tk.X)
+        queue_btn = tk.Button(
+            queue_frame,
+            text="Queue Frame",
+            command=self._queue_frame,
+            font=("Arial", 10),
+            bg="#795548",
+            fg="white",
+            padx=10,
+            pady=5
+        )
+        queue_btn.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 2))
+        self.analyze_queue_btn = tk.Button(
+            queue_frame,
+            text="Analyze Queue (0)",
+            command=self._analyze_queue,
+            font=("Arial", 10),
+            bg="#795548",
+            fg="white",
+            padx=10,
+            pady=5,
+            state=tk.DISABLED
+        )
+        self.analyze_queue_btn.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(2, 0))
         
         # Export results button
         self.export_btn = tk.Button(
@@ -420,14 +1252,31 @@ class TileExtractorGUI:
         if _REQUESTS_AVAILABLE:
             self.data_session = requests.Session()
             # Set connection pool size to ensure isolation
-            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            # (retries only reconnect; urllib3 does not re-send a POST after a read error)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1,
+                                                    max_retries=Retry(total=2, backoff_factor=0.2))
             self.data_session.mount('http://', adapter)
+            self.data_session.mount('https://', adapter)  # in case backend_url points at a remote host
+            # Replies are tiny; skip negotiating (and decompressing) gzip
+            self.data_session.headers.update({
+                "Content-Type": "application/json",
+                "Accept-Encoding": "identity",
+            })
         else:
             self.data_session = None
         
-        # Auto-capture state
-        self.auto_capture_running = False
-        self.auto_capture_timer = None
+        # Auto-capture state (set while stopped, like _publisher_stop)
+        self._auto_stop = threading.Event()
+        self._auto_stop.set()
+        self._auto_capture_thread: Optional[threading.Thread] = None
+        # Thumbnail of the last analyzed frame; a near-identical frame skips
+        # hand detection and the VLM call entirely
+        self._last_gate_frame: Optional[np.ndarray] = None
+        self.gate_threshold = 3.0  # mean absolute difference, 0-255 scale
+        # Captured frames wait here for the analysis worker (newest only)
+        self._analysis_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._analysis_thread: Optional[threading.Thread] = None
+        self._result_lock = threading.Lock()  # guards last_result across threads
         
         # Auto-capture button
         self.auto_capture_btn = tk.Button(
@@ -442,24 +1291,24 @@ class TileExtractorGUI:
         )
         self.auto_capture_btn.pack(pady=5, fill=tk.X)
         
-        # Tile publisher button
-        if self.tile_publisher is not None:
-            self.publisher_btn = tk.Button(
-                right_frame,
-                text="Start Tile Publisher (1s)",
-                command=self._toggle_publisher,
-                font=("Arial", 10),
-                bg="#FF5722",
-                fg="white",
-                padx=10,
-                pady=5
-            )
+        # Tile publisher button (hidden by _poll_init if the publisher fails)
+        self.publisher_btn = tk.Button(
+            right_frame,
+            text="Start Tile Publisher (1s)",
+            command=self._toggle_publisher,
+            font=("Arial", 10),
+            bg="#FF5722",
+            fg="white",
+            padx=10,
+            pady=5
+        )
+        if _TILE_PUBLISHER_AVAILABLE:
             self.publisher_btn.pack(pady=5, fill=tk.X)
         
         # Status label
         self.status_label = tk.Label(
             right_frame,
-            text="Ready. Load an image to begin.",
+            text="Initializing...",
             font=("Arial", 10),
             wraplength=380,
             justify=tk.LEFT
@@ -495,6 +1344,91 @@ class TileExtractorGUI:
         if file_path:
             self.load_image(file_path)
     
+    def _analyze_batch_dialog(self):
+        """Analyze several image files concurrently and list a summary of each."""
+        file_paths = filedialog.askopenfilenames(
+            title="Select Images to Analyze",
+            filetypes=[
+                ("Image files", "*.jpg *.jpeg *.png *.bmp *.gif"),
+                ("All files", "*.*")
+            ]
+        )
+        if not file_paths:
+            return
+        
+        self.status_label.config(text=f"Analyzing {len(file_paths)} images...")
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, f"BATCH ANALYSIS ({len(file_paths)} images)\n" + "=" * 50 + "\n")
+        use_cache = not self.bypass_cache_var.get()
+        remaining = [len(file_paths)]
+        
+        def on_done(path, future):
+            # Runs on the Tk thread
+            name = Path(path).name
+            try:
+                result = future.result()
+                words = sum(len(w) for w in result.get("player_words", {}).values())
+                line = f"{name}: {words} words, {len(result.get('free_letters', []))} free letters\n"
+            except Exception as e:
+                logger.error(f"Batch analysis of {path} failed: {e}")
+                line = f"{name}: ERROR {e}\n"
+            self.results_text.insert(tk.END, line)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                self.status_label.config(text="Batch analysis complete!")
+        
+        for path in file_paths:
+            future = self._batch_pool.submit(self.vlm_client.analyze_board, path, use_cache=use_cache)
+            future.add_done_callback(lambda f, p=path: self.root.after(0, on_done, p, f))
+    
+    def _queue_frame(self):
+        """Add the current image to the multi-frame queue."""
+        if not self.current_image_path:
+            messagebox.showwarning("No Image", "Please load an image first.")
+            return
+        if len(self.pending_frames) >= self.vlm_client.MAX_BATCH_FRAMES:
+            messagebox.showwarning("Queue Full", f"At most {self.vlm_client.MAX_BATCH_FRAMES} frames can be analyzed together.")
+            return
+        self.pending_frames.append(self.current_frame if self.current_frame is not None else self.current_image_path)
+        self.analyze_queue_btn.config(text=f"Analyze Queue ({len(self.pending_frames)})", state=tk.NORMAL)
+        self.status_label.config(text=f"Queued frame {len(self.pending_frames)}.")
+    
+    def _analyze_queue(self):
+        """Send all queued frames in one API call; show the reading with the most tiles."""
+        if not self.pending_frames:
+            return
+        if self._click_future is not None and not self._click_future.done():
+            return  # an analysis is already in flight
+        frames, self.pending_frames = self.pending_frames, []
+        self.analyze_queue_btn.config(text="Analyze Queue (0)", state=tk.DISABLED)
+        self.status_label.config(text=f"Analyzing {len(frames)} frames with Claude API...")
+        self.root.update_idletasks()
+        
+        def on_done(future):
+            # Runs on the Tk thread
+            try:
+                results = future.result()
+            except Exception as e:
+                error_msg = f"Error during analysis: {e}"
+                logger.error(error_msg)
+                self.status_label.config(text=error_msg)
+                messagebox.showerror("Analysis Error", error_msg)
+                return
+            
+            def tile_count(result):
+                words = result.get("player_words") or {}
+                tiles = sum(len(w.get("word", "")) for ws in words.values() for w in ws)
+                return tiles + len(result.get("free_letters") or [])
+            
+            best = max(range(len(results)), key=lambda i: tile_count(results[i]))
+            for i, result in enumerate(results):
+                logger.info(f"Frame {i}: {tile_count(result)} tiles")
+            self._display_results(results[best])
+            self.status_label.config(text=f"Analyzed {len(results)} frames; showing frame {best} (most tiles).")
+        
+        self._click_future = self._click_pool.submit(self.vlm_client.analyze_frames, frames)
+        self._click_future.add_done_callback(lambda f: self.root.after(0, on_done, f))
+    
     def _validate_no_hands_multiple_frames(self, initial_frame, frame_delay=0.25, num_validation_frames=3):
         """
         Validate that no hands are detected across multiple frames.
@@ -513,38 +1447,85 @@ class TileExtractorGUI:
             return initial_frame, True
         
         # Check initial frame again (sanity check)
-        if self.hand_detector.detect_hands(initial_frame):
+        if self.hand_detector.detect_hands(_detection_frame(initial_frame)):
             print("[VALIDATION] Initial frame now has hands, validation failed")
             return initial_frame, False
         
-        # Validate across multiple frames
+        # Validate across multiple frames. A producer thread keeps capturing on
+        # the frame_delay cadence while this thread runs detection on the
+        # previous frame, so capture and detection overlap.
+        frames: queue.Queue = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        
+        def produce():
+            for i in range(num_validation_frames):
+                print(f"[VALIDATION] Waiting {frame_delay}s before validation frame {i+1}/{num_validation_frames}...")
+                if stop.wait(frame_delay):
+                    return
+                try:
+                    frame = self.oak.get_rgb()
+                except Exception as e:
+                    logger.warning(f"Validation frame {i+1} capture raised: {e}")
+                    frame = None
+                frames.put((i, frame))
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
         validated_frame = initial_frame
-        for i in range(num_validation_frames):
-            print(f"[VALIDATION] Waiting {frame_delay}s before validation frame {i+1}/{num_validation_frames}...")
-            time.sleep(frame_delay)
-            
-            # Capture new frame
-            validation_frame = self.oak.get_rgb()
-            if validation_frame is None:
-                print(f"[VALIDATION] ERROR: Failed to capture validation frame {i+1}")
-                logger.warning(f"Failed to capture validation frame {i+1}, using previous frame")
-                continue
-            
-            # Check for hands
-            has_hands = self.hand_detector.detect_hands(validation_frame)
-            if has_hands:
-                print(f"[VALIDATION] *** HAND DETECTED in validation frame {i+1}! Validation failed ***")
-                logger.info(f"Hand detected in validation frame {i+1}, validation failed")
-                return validation_frame, False
-            
-            # Update validated frame to the latest one
-            validated_frame = validation_frame
-            print(f"[VALIDATION] Validation frame {i+1}/{num_validation_frames} passed (no hands)")
+        try:
+            for _ in range(num_validation_frames):
+                i, validation_frame = frames.get()
+                if validation_frame is None:
+                    print(f"[VALIDATION] ERROR: Failed to capture validation frame {i+1}")
+                    logger.warning(f"Failed to capture validation frame {i+1}, using previous frame")
+                    continue
+                
+                # Check for hands
+                has_hands = self.hand_detector.detect_hands(_detection_frame(validation_frame))
+                if has_hands:
+                    print(f"[VALIDATION] *** HAND DETECTED in validation frame {i+1}! Validation failed ***")
+                    logger.info(f"Hand detected in validation frame {i+1}, validation failed")
+                    return validation_frame, False
+                
+                # Update validated frame to the latest one
+                validated_frame = validation_frame
+                print(f"[VALIDATION] Validation frame {i+1}/{num_validation_frames} passed (no hands)")
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue, then wait for it
+            while producer.is_alive():
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    pass
+                producer.join(timeout=0.05)
         
         print(f"[VALIDATION] All {num_validation_frames} validation frames passed (no hands detected)")
         logger.info(f"All {num_validation_frames} validation frames passed (no hands detected)")
         return validated_frame, True
     
+    def _wait_for_hand_away(self, timeout: float = 30.0) -> Optional[np.ndarray]:
+        """
+        Block until the hand detector's frame stream reports no hands for several
+        consecutive frames, and return that frame. Returns None on timeout or if
+        the detector has no streaming support (callers then fall back to polling).
+        """
+        if not hasattr(self.hand_detector, "start_stream"):
+            return None
+        
+        clear = threading.Event()
+        captured = {}
+        
+        def on_hand_away(frame):
+            captured["frame"] = frame
+            clear.set()
+        
+        stop = self.hand_detector.start_stream(self.oak.get_rgb, on_hand_away, preprocess=_detection_frame)
+        clear.wait(timeout)
+        stop.set()
+        return captured.get("frame")
+    
     def _capture_from_camera(self):
         """Capture a frame from the Oak camera, checking for hands and retrying if needed."""
         if self.oak is None:
@@ -552,7 +1533,7 @@ class TileExtractorGUI:
             return
         
         self.status_label.config(text="Capturing frame from camera...")
-        self.root.update()
+        self.root.update_idletasks()
         
         try:
             # Get RGB frame from camera (for hand detection)
@@ -562,23 +1543,65 @@ class TileExtractorGUI:
                 messagebox.showerror("Capture Error", "Failed to capture frame from camera.\nCamera may not be ready yet.")
                 self.status_label.config(text="Camera capture failed.")
                 return
-            
-            # Check for hands if detector is available - keep retrying until no hand is detected
-            if self.hand_detector is not None:
+        except Exception as e:
+            self._capture_failed(e)
+            return
+        
+        if self.hand_detector is None:
+            print("[CAPTURE] Hand detector is NOT available, skipping hand check")
+            self._finish_capture(rgb_frame)
+            return
+        
+        # Waiting for hands to clear runs on a worker thread; the button stays
+        # disabled until the capture ends so no second capture can start
+        self.status_label.config(text="Waiting for hands to clear the board...")
+        self.capture_btn.config(state=tk.DISABLED)
+        threading.Thread(target=self._await_hands_clear, args=(rgb_frame,), daemon=True).start()
+    
+    def _capture_failed(self, e: Exception):
+        error_msg = f"Error capturing from camera: {e}"
+        logger.error(error_msg, exc_info=True)
+        self._capture_error(error_msg)
+    
+    def _capture_error(self, error_msg: str, status: Optional[str] = None):
+        """End a manual capture with an error dialog (Tk thread)."""
+        self.capture_btn.config(state=tk.NORMAL)
+        messagebox.showerror("Capture Error", error_msg)
+        self.status_label.config(text=status or error_msg)
+    
+    def _await_hands_clear(self, rgb_frame: np.ndarray):
+        """Worker-thread half of _capture_from_camera: wait until no hands are
+        over the board, then hand the clear frame to _finish_capture on the
+        Tk thread. Status updates are marshalled with root.after."""
+        def set_status(text):
+            self.root.after(0, lambda: self.status_label.config(text=text))
+        
+        try:
+            # Wait for hands to clear via the detector's frame stream
+            streamed = self._wait_for_hand_away()
+            if streamed is not None:
+                rgb_frame = streamed
+                print("[CAPTURE] Hands clear across consecutive frames, proceeding with capture")
+                logger.info("Hands clear across consecutive frames, proceeding with capture")
+            # Otherwise poll - keep retrying until no hand is detected
+            else:
                 print("[CAPTURE] Hand detector is available, checking for hands...")
-                max_retries = 100  # Safety limit to prevent infinite loop
+                # Safety limit to prevent an endless wait; recapture on a short
+                # interval so a hand that leaves is noticed quickly
+                max_wait = 100.0
+                retry_interval = 0.25
+                deadline = time.monotonic() + max_wait
                 retry_count = 0
                 
-                while retry_count < max_retries:
+                while time.monotonic() < deadline:
                     print(f"[CAPTURE] Checking for hands (attempt {retry_count + 1})...")
-                    has_hands = self.hand_detector.detect_hands(rgb_frame)
+                    has_hands = self.hand_detector.detect_hands(_detection_frame(rgb_frame))
                     print(f"[CAPTURE] Hand detection result: {has_hands}")
                     
                     if not has_hands:
                         print("[CAPTURE] No hand detected, validating with multiple frames...")
                         logger.info("No hand detected, validating with multiple frames...")
-                        self.status_label.config(text="No hand detected, validating with multiple frames...")
-                        self.root.update()
+                        set_status("No hand detected, validating with multiple frames...")
                         
                         # Validate with multiple frames
                         validated_frame, all_clear = self._validate_no_hands_multiple_frames(rgb_frame)
@@ -587,90 +1610,114 @@ class TileExtractorGUI:
                         if all_clear:
                             print("[CAPTURE] Validation passed, proceeding with capture")
                             logger.info("Validation passed, proceeding with capture")
-                            self.status_label.config(text="Validation passed, proceeding with capture...")
-                            self.root.update()
+                            set_status("Validation passed, proceeding with capture...")
                             break
                         else:
                             print("[CAPTURE] Validation failed (hands detected in validation frames), retrying...")
                             logger.info("Validation failed (hands detected in validation frames), retrying...")
-                            self.status_label.config(text="Validation failed, retrying...")
-                            self.root.update()
+                            set_status("Validation failed, retrying...")
                             retry_count += 1
-                            time.sleep(1.0)
+                            time.sleep(retry_interval)
                             rgb_frame = self.oak.get_rgb()
                             if rgb_frame is None:
                                 print("[CAPTURE] ERROR: Failed to recapture frame")
-                                messagebox.showerror("Capture Error", "Failed to recapture frame from camera.")
-                                self.status_label.config(text="Camera recapture failed.")
+                                self.root.after(0, self._capture_error, "Failed to recapture frame from camera.", "Camera recapture failed.")
                                 return
                             continue
                     
                     # Hand detected, wait and recapture
                     retry_count += 1
-                    print(f"[CAPTURE] *** HAND DETECTED! Attempt {retry_count}, waiting 1 second and recapturing... ***")
-                    logger.info(f"Hand detected in image (attempt {retry_count}), waiting 1 second and recapturing...")
-                    self.status_label.config(text=f"Hand detected! Waiting 1 second and recapturing... (attempt {retry_count})")
-                    self.root.update()
-                    time.sleep(1.0)
+                    print(f"[CAPTURE] *** HAND DETECTED! Attempt {retry_count}, waiting {retry_interval}s and recapturing... ***")
+                    logger.info(f"Hand detected in image (attempt {retry_count}), waiting {retry_interval}s and recapturing...")
+                    set_status(f"Hand detected! Waiting {retry_interval}s and recapturing... (attempt {retry_count})")
+                    time.sleep(retry_interval)
                     
                     # Recapture
                     print(f"[CAPTURE] Recapturing frame...")
                     rgb_frame = self.oak.get_rgb()
                     if rgb_frame is None:
                         print("[CAPTURE] ERROR: Failed to recapture frame")
-                        messagebox.showerror("Capture Error", "Failed to recapture frame from camera.")
-                        self.status_label.config(text="Camera recapture failed.")
+                        self.root.after(0, self._capture_error, "Failed to recapture frame from camera.", "Camera recapture failed.")
                         return
                     print(f"[CAPTURE] Frame recaptured, shape: {rgb_frame.shape}")
-                
-                if retry_count >= max_retries:
-                    print(f"[CAPTURE] WARNING: Max retries ({max_retries}) reached, proceeding anyway")
-                    logger.warning(f"Max retries ({max_retries}) reached, proceeding anyway")
-                    self.status_label.config(text=f"Max retries reached, proceeding with capture...")
-                    self.root.update()
-            else:
-                print("[CAPTURE] Hand detector is NOT available, skipping hand check")
-            
-            # Convert to RGB if needed (for display)
-            if len(rgb_frame.shape) == 2:
-                rgb_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_GRAY2RGB)
+                else:
+                    # Deadline passed without a break
+                    print(f"[CAPTURE] WARNING: No clear frame within {max_wait:.0f}s, proceeding anyway")
+                    logger.warning(f"No clear frame within {max_wait:.0f}s, proceeding anyway")
+                    set_status("Hands did not clear in time, proceeding with capture...")
+        except Exception as e:
+            error_msg = f"Error capturing from camera: {e}"
+            logger.error(error_msg, exc_info=True)
+            self.root.after(0, self._capture_error, error_msg)
+            return
+        self.root.after(0, self._finish_capture, rgb_frame)
+    
+    def _finish_capture(self, rgb_frame: np.ndarray):
+        """Save and display a hand-free capture (Tk thread), ending the capture."""
+        self.capture_btn.config(state=tk.NORMAL)
+        try:
+            # A grayscale frame is kept as-is: it is saved as a grayscale JPEG,
+            # Tk displays it directly and analyze_board expands it after downscaling
             
             # Save to temporary file
             temp_dir = Path(__file__).parent / "temp"
             temp_dir.mkdir(exist_ok=True)
             
-            # Clean up old temp file if exists
-            if self.temp_image_path and os.path.exists(self.temp_image_path):
-                try:
-                    os.remove(self.temp_image_path)
-                except:
-                    pass
-            
-            # Save new capture
+            # Save new capture; os.replace swaps it in atomically over the
+            # previous one, so readers never see a missing or partial file
             self.temp_image_path = str(temp_dir / "camera_capture.jpg")
-            cv2.imwrite(self.temp_image_path, cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR))
+            new_path = self.temp_image_path + ".new"
+            with open(new_path, 'wb') as f:
+                f.write(_encode_jpeg(rgb_frame, 95, colorspace='RGB'))
+            os.replace(new_path, self.temp_image_path)
             
             # Load and display
-            self.load_image(self.temp_image_path)
+            # Display and analyze the frame from memory rather than re-decoding the file
+            self.load_image(self.temp_image_path, rgb_frame)
             self.status_label.config(text="Frame captured! Click on image to analyze.")
             logger.info(f"Captured frame from camera: {self.temp_image_path}")
             
         except Exception as e:
-            error_msg = f"Error capturing from camera: {e}"
-            logger.error(error_msg, exc_info=True)
-            messagebox.showerror("Capture Error", error_msg)
-            self.status_label.config(text=error_msg)
+            self._capture_failed(e)
     
-    def load_image(self, image_path: str):
-        """Load and display an image at full size."""
+    def load_image(self, image_path: str, image: Optional[Union[np.ndarray, Image.Image]] = None):
+        """Load and display an image at full size (scaled down only if it is
+        larger than the screen; analysis always uses the full-resolution source).
+        
+        If image is given (an RGB camera frame or a PIL image already in memory)
+        it is displayed directly and image_path is only used as its label.
+        """
         try:
             self.current_image_path = image_path
-            # Load original image without resizing for display
-            self.current_image = Image.open(image_path)
+            self.current_frame = image if isinstance(image, np.ndarray) else None
             
-            # Create PhotoImage from full-size image
-            # Note: Tkinter PhotoImage can handle large images, but may be slow for very large ones
-            self.photo = ImageTk.PhotoImage(self.current_image)
+            if image is not None and image is self._photo_source:
+                # Same image as on screen: reuse the PhotoImage, no re-upload to Tk
+                pass
+            else:
+                # Load original image, decoded no larger than the screen
+                max_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+                if image is None:
+                    img = Image.open(image_path)
+                    self._image_size = img.size
+                    # JPEG: libjpeg scales by 1/2, 1/4 or 1/8 during the IDCT
+                    img.draft(img.mode, max_size)
+                elif isinstance(image, np.ndarray):
+                    img = Image.fromarray(image)
+                    self._image_size = img.size
+                else:
+                    img = image
+                    self._image_size = img.size
+                if img.width > max_size[0] or img.height > max_size[1]:
+                    if img is image:
+                        img = img.copy()  # thumbnail() works in place
+                    img.thumbnail(max_size, Image.BILINEAR)
+                self.current_image = img
+                
+                # Create PhotoImage from full-size image
+                # Note: Tkinter PhotoImage can handle large images, but may be slow for very large ones
+                self.photo = ImageTk.PhotoImage(self.current_image)
+                self._photo_source = image
             self.image_label.configure(image=self.photo, bg="gray")
             self.image_label.image = self.photo  # Keep a reference
             
@@ -688,7 +1735,7 @@ class TileExtractorGUI:
             self.canvas.coords(self.image_window_id, 0, 0)
             
             self.status_label.config(
-                text=f"Loaded: {Path(image_path).name} ({self.current_image.width}x{self.current_image.height})\nClick on image to analyze."
+                text=f"Loaded: {Path(image_path).name} ({self._image_size[0]}x{self._image_size[1]})\nClick on image to analyze."
             )
             self.results_text.delete(1.0, tk.END)
             
@@ -702,17 +1749,34 @@ class TileExtractorGUI:
             messagebox.showwarning("No Image", "Please load an image first.")
             return
         
+        if self._click_future is not None and not self._click_future.done():
+            return  # an analysis is already in flight
+        
         # Disable interaction during analysis
         self.status_label.config(text="Analyzing with Claude API...\nOptimizing image and sending request...")
-        self.root.update()
+        self.root.update_idletasks()
         try:
             self.root.config(cursor="watch")  # "watch" is the standard cursor name
         except:
             self.root.config(cursor="")  # Fallback if cursor not supported
         
+        logger.info("Starting VLM analysis")
+        image = self.current_frame if self.current_frame is not None else self.current_image_path
+        self._click_future = self._click_pool.submit(
+            self.vlm_client.analyze_board, image, previous_result=self.last_result,
+            use_cache=not self.bypass_cache_var.get(),
+            on_progress=lambda n: self.root.after(0, lambda: self.status_label.config(
+                text=f"Analyzing with Claude API...\nReceiving reply ({n} characters)..."
+            ))
+        )
+        self._click_future.add_done_callback(
+            lambda f: self.root.after(0, self._on_analysis_done, f)
+        )
+    
+    def _on_analysis_done(self, future):
+        """Show the outcome of a click-triggered analysis (runs on the Tk thread)."""
         try:
-            logger.info("Starting VLM analysis")
-            result = self.vlm_client.analyze_board(self.current_image_path, previous_result=self.last_result)
+            result = future.result()
             self._display_results(result)
             self.status_label.config(text="Analysis complete!")
             logger.info("Analysis completed successfully")
@@ -739,58 +1803,59 @@ class TileExtractorGUI:
     
     def _display_results(self, result: Dict):
         """Display analysis results in the text widget."""
-        self.last_result = result
+        with self._result_lock:
+            self.last_result = result
         self.export_btn.config(state=tk.NORMAL)
         if _REQUESTS_AVAILABLE:
             self.post_btn.config(state=tk.NORMAL)
         self.results_text.delete(1.0, tk.END)
         
-        output = []
-        output.append("=" * 50)
-        output.append("TILE EXTRACTION RESULTS")
-        output.append("=" * 50)
-        output.append("")
+        buf = io.StringIO()
+        w = buf.write
+        rule = "=" * 50 + "\n"
+        w(rule)
+        w("TILE EXTRACTION RESULTS\n")
+        w(rule)
+        w("\n")
         
         # Display words by player
         player_words = result.get("player_words", {})
         if player_words:
-            output.append("WORDS BY PLAYER:")
-            output.append("-" * 50)
+            w("WORDS BY PLAYER:\n")
+            w("-" * 50 + "\n")
             
             total_words = 0
             for player, words in player_words.items():
-                output.append(f"\n{player.upper()}:")
+                w(f"\n{player.upper()}:\n")
                 if words:
                     for word_data in words:
                         word = word_data.get("word", "")
                         tiles = word_data.get("tiles", [])
                         tiles_str = " ".join(tiles) if tiles else "N/A"
-                        output.append(f"  • {word} [{tiles_str}]")
+                        w(f"  • {word} [{tiles_str}]\n")
                         total_words += 1
                 else:
-                    output.append("  (no words)")
-                output.append("")
-            output.append(f"Total words found: {total_words}")
-            output.append("")
+                    w("  (no words)\n")
+                w("\n")
+            w(f"Total words found: {total_words}\n\n")
         else:
-            output.append("No words found.")
-            output.append("")
+            w("No words found.\n\n")
         
         # Display free letters
         free_letters = result.get("free_letters", [])
-        output.append("FREE LETTERS (not in words):")
-        output.append("-" * 50)
+        w("FREE LETTERS (not in words):\n")
+        w("-" * 50 + "\n")
         if free_letters:
-            output.append(f"  {', '.join(free_letters)}")
-            output.append(f"\n  Total: {len(free_letters)} letters")
+            w(f"  {', '.join(free_letters)}\n")
+            w(f"\n  Total: {len(free_letters)} letters\n")
         else:
-            output.append("  None")
+            w("  None\n")
         
-        output.append("")
-        output.append("=" * 50)
+        w("\n")
+        w("=" * 50)
         
         # Write to text widget
-        self.results_text.insert(tk.END, "\n".join(output))
+        self.results_text.insert(tk.END, buf.getvalue())
     
     def _export_results(self):
         """Export results to JSON file."""
@@ -806,8 +1871,8 @@ class TileExtractorGUI:
         
         if file_path:
             try:
-                with open(file_path, 'w') as f:
-                    json.dump(self.last_result, f, indent=2)
+                with open(file_path, 'wb') as f:
+                    f.write(_json_dumps(self.last_result, indent=True))
                 messagebox.showinfo("Success", f"Results exported to:\n{file_path}")
                 logger.info(f"Exported results to: {file_path}")
             except Exception as e:
@@ -846,30 +1911,44 @@ class TileExtractorGUI:
         player_words = result.get("player_words", {})
         
         # Convert to list of player entries, preserving order
-        # Handle both "player_1"/"player_2" and "left_player"/"right_player" formats
-        player_keys = sorted(player_words.keys())
-        
-        for player_key in player_keys:
-            words_list = player_words[player_key]
-            # Extract just the word strings (lowercase) from word objects
-            words = []
-            for word_data in words_list:
-                if isinstance(word_data, dict):
-                    word = word_data.get("word", "")
-                else:
-                    word = str(word_data)
-                if word:
-                    words.append(word.lower())
-            
-            backend_data["players"].append({"words": words})
+        # Handle both "player_1"/"player_2" and "left_player"/"right_player" formats;
+        # the prompt's player_N keys already arrive in order, so only other
+        # key styles need sorting
+        if all(key.startswith("player_") for key in player_words):
+            player_keys = list(player_words)
+        else:
+            player_keys = sorted(player_words)
+        
+        # Extract just the word strings (lowercase) from word objects
+        backend_data["players"] = [
+            {"words": [
+                word.lower()
+                for word_data in player_words[player_key]
+                if (word := word_data.get("word", "") if isinstance(word_data, dict) else str(word_data))
+            ]}
+            for player_key in player_keys
+        ]
         
         # Transform free_letters array to concatenated string (lowercase)
         free_letters = result.get("free_letters", [])
         if free_letters:
-            backend_data["availableLetters"] = "".join(letter.lower() for letter in free_letters)
+            backend_data["availableLetters"] = "".join(free_letters).lower()
         
         return backend_data
     
+    def _backend_payload(self, result: Dict) -> Tuple[Dict, bytes]:
+        """Backend data and its JSON body, reused while the result is unchanged."""
+        cached_result, backend_data, body = self._cached_backend
+        if cached_result is not result:
+            backend_data = self._transform_to_backend_format(result)
+            body = _json_dumps(backend_data)
+            self._cached_backend = (result, backend_data, body)
+        return backend_data, body
+    
+    def _post_json(self, body: bytes):
+        """POST an encoded JSON body to the update-data endpoint."""
+        return self.data_session.post(self.backend_url, data=body, timeout=10.0)
+    
     def _post_to_backend(self):
         """Post results to backend API."""
         if not self.last_result:
@@ -881,27 +1960,21 @@ class TileExtractorGUI:
             return
         
         # Transform to backend format
-        backend_data = self._transform_to_backend_format(self.last_result)
+        backend_data, body = self._backend_payload(self.last_result)
         
         self.status_label.config(text="Posting to backend...")
-        self.root.update()
+        self.root.update_idletasks()
         
+        # Post JSON to backend using dedicated session to avoid interference with image publisher
+        future = self._post_pool.submit(self._post_json, body)
+        future.add_done_callback(
+            lambda f: self.root.after(0, self._on_post_done, f, backend_data)
+        )
+    
+    def _on_post_done(self, future, backend_data: Dict):
+        """Report the outcome of a manual backend post (runs on the Tk thread)."""
         try:
-            # Post JSON to backend using dedicated session to avoid interference with image publisher
-            if self.data_session is None:
-                response = requests.post(
-                    self.backend_url,
-                    json=backend_data,
-                    headers={"Content-Type": "application/json"},
-                    timeout=10.0
-                )
-            else:
-                response = self.data_session.post(
-                    self.backend_url,
-                    json=backend_data,
-                    headers={"Content-Type": "application/json"},
-                    timeout=10.0
-                )
+            response = future.result()
             
             # Check response
             response.raise_for_status()
@@ -913,7 +1986,7 @@ class TileExtractorGUI:
             self.status_label.config(text="Posted to backend successfully!")
             messagebox.showinfo("Success", success_msg)
             logger.info(f"Posted results to {self.backend_url}: {response.status_code}")
-            logger.debug(f"Posted data: {json.dumps(backend_data, indent=2)}")
+            logger.debug("Posted data: %s", _LazyJSON(backend_data))
             
         except requests.exceptions.RequestException as e:
             error_msg = f"Failed to post to backend: {e}"
@@ -939,34 +2012,39 @@ class TileExtractorGUI:
         
         if self.auto_capture_running:
             # Stop auto-capture
-            self.auto_capture_running = False
-            if self.auto_capture_timer:
-                self.auto_capture_timer.cancel()
-                self.auto_capture_timer = None
+            self._auto_stop.set()
+            self._submit_for_analysis(None)
             self.auto_capture_btn.config(text="Start Auto-Capture (5s)", bg="#4CAF50")
             self.status_label.config(text="Auto-capture stopped.")
             logger.info("Auto-capture stopped")
         else:
             # Start auto-capture
-            self.auto_capture_running = True
+            self._auto_stop.clear()
             self.auto_capture_btn.config(text="Stop Auto-Capture", bg="#F44336")
             self.status_label.config(text="Auto-capture started. Capturing every 5 seconds...")
             logger.info("Auto-capture started")
-            # Start the first cycle immediately
-            self._schedule_next_capture()
+            if self._analysis_thread is None or not self._analysis_thread.is_alive():
+                self._analysis_thread = threading.Thread(target=self._analysis_worker, daemon=True)
+                self._analysis_thread.start()
+            # Run the capture loop in a separate thread to avoid blocking GUI
+            # (a loop still finishing a cycle from before a quick stop/start
+            # sees the cleared event and simply carries on)
+            if self._auto_capture_thread is None or not self._auto_capture_thread.is_alive():
+                self._auto_capture_thread = threading.Thread(target=self._auto_capture_loop, daemon=True)
+                self._auto_capture_thread.start()
     
-    def _schedule_next_capture(self):
-        """Schedule the next auto-capture cycle."""
-        if not self.auto_capture_running:
-            return
-        
-        # Run the capture cycle in a separate thread to avoid blocking GUI
-        thread = threading.Thread(target=self._auto_capture_cycle, daemon=True)
-        thread.start()
+    def _auto_capture_loop(self):
+        """Run a capture cycle now and then every 5 seconds until stopped.
         
-        # Schedule next capture in 5 seconds
-        self.auto_capture_timer = threading.Timer(5.0, self._schedule_next_capture)
-        self.auto_capture_timer.start()
+        A slow cycle (e.g. waiting for hands) delays the next one instead of
+        overlapping it.
+        """
+        interval = 5.0
+        while not self._auto_stop.is_set():
+            started = time.monotonic()
+            self._auto_capture_cycle()
+            if self._auto_stop.wait(max(0.0, interval - (time.monotonic() - started))):
+                break
     
     def _auto_capture_cycle(self):
         """Perform one complete cycle: capture -> analyze -> post."""
@@ -989,15 +2067,39 @@ class TileExtractorGUI:
                 self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Failed to capture frame"))
                 return
             
-            # Check for hands if detector is available - keep retrying until no hand is detected
+            # Skip the whole cycle if the board has not changed since the last analysis
+            if self._last_gate_frame is not None and self.last_result is not None:
+                diff = np.abs(_gate_thumbnail(rgb_frame).astype(np.int16) - self._last_gate_frame).mean()
+                if diff < self.gate_threshold:
+                    logger.info(f"Auto-capture: Board unchanged (diff {diff:.2f}), skipping analysis")
+                    self.root.after(0, lambda: self.status_label.config(
+                        text="Auto-capture: Board unchanged. Next capture in 5s..."
+                    ))
+                    return
+            
+            # Wait for hands to clear via the detector's frame stream
+            streamed = None
             if self.hand_detector is not None:
+                self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Waiting for hands to clear..."))
+                streamed = self._wait_for_hand_away()
+            
+            if streamed is not None:
+                rgb_frame = streamed
+                print("[AUTO-CAPTURE] Hands clear across consecutive frames, proceeding with capture")
+                logger.info("Auto-capture: Hands clear across consecutive frames, proceeding with capture")
+            # Otherwise poll - keep retrying until no hand is detected
+            elif self.hand_detector is not None:
                 print("[AUTO-CAPTURE] Hand detector is available, checking for hands...")
-                max_retries = 100  # Safety limit to prevent infinite loop
+                # Safety limit to prevent an endless wait; recapture on a short
+                # interval so a hand that leaves is noticed quickly
+                max_wait = 100.0
+                retry_interval = 0.25
+                deadline = time.monotonic() + max_wait
                 retry_count = 0
                 
-                while retry_count < max_retries:
+                while time.monotonic() < deadline:
                     print(f"[AUTO-CAPTURE] Checking for hands (attempt {retry_count + 1})...")
-                    has_hands = self.hand_detector.detect_hands(rgb_frame)
+                    has_hands = self.hand_detector.detect_hands(_detection_frame(rgb_frame))
                     print(f"[AUTO-CAPTURE] Hand detection result: {has_hands}")
                     
                     if not has_hands:
@@ -1019,7 +2121,7 @@ class TileExtractorGUI:
                             logger.info("Auto-capture: Validation failed (hands detected in validation frames), retrying...")
                             self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Validation failed, retrying..."))
                             retry_count += 1
-                            time.sleep(1.0)
+                            time.sleep(retry_interval)
                             rgb_frame = self.oak.get_rgb()
                             if rgb_frame is None:
                                 print("[AUTO-CAPTURE] ERROR: Failed to recapture frame")
@@ -1030,10 +2132,10 @@ class TileExtractorGUI:
                     
                     # Hand detected, wait and recapture
                     retry_count += 1
-                    print(f"[AUTO-CAPTURE] *** HAND DETECTED! Attempt {retry_count}, waiting 1 second and recapturing... ***")
-                    logger.info(f"Auto-capture: Hand detected in image (attempt {retry_count}), waiting 1 second and recapturing...")
-                    self.root.after(0, lambda c=retry_count: self.status_label.config(text=f"Auto-capture: Hand detected! Waiting 1 second and recapturing... (attempt {c})"))
-                    time.sleep(1.0)
+                    print(f"[AUTO-CAPTURE] *** HAND DETECTED! Attempt {retry_count}, waiting {retry_interval}s and recapturing... ***")
+                    logger.info(f"Auto-capture: Hand detected in image (attempt {retry_count}), waiting {retry_interval}s and recapturing...")
+                    self.root.after(0, lambda c=retry_count: self.status_label.config(text=f"Auto-capture: Hand detected! Waiting {retry_interval}s and recapturing... (attempt {c})"))
+                    time.sleep(retry_interval)
                     
                     # Recapture
                     print(f"[AUTO-CAPTURE] Recapturing frame...")
@@ -1044,91 +2146,114 @@ class TileExtractorGUI:
                         self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Failed to recapture frame"))
                         return
                     print(f"[AUTO-CAPTURE] Frame recaptured, shape: {rgb_frame.shape}")
-                
-                if retry_count >= max_retries:
-                    print(f"[AUTO-CAPTURE] WARNING: Max retries ({max_retries}) reached, proceeding anyway")
-                    logger.warning(f"Auto-capture: Max retries ({max_retries}) reached, proceeding anyway")
-                    self.root.after(0, lambda: self.status_label.config(text=f"Auto-capture: Max retries reached, proceeding..."))
+                else:
+                    # Deadline passed without a break
+                    print(f"[AUTO-CAPTURE] WARNING: No clear frame within {max_wait:.0f}s, proceeding anyway")
+                    logger.warning(f"Auto-capture: No clear frame within {max_wait:.0f}s, proceeding anyway")
+                    self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Hands did not clear in time, proceeding..."))
             else:
                 print("[AUTO-CAPTURE] Hand detector is NOT available, skipping hand check")
             
-            # Convert to RGB if needed (for display)
-            if len(rgb_frame.shape) == 2:
-                rgb_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_GRAY2RGB)
-            
-            # Save to temporary file
-            temp_dir = Path(__file__).parent / "temp"
-            temp_dir.mkdir(exist_ok=True)
-            
-            # Clean up old temp file if exists
-            if self.temp_image_path and os.path.exists(self.temp_image_path):
-                try:
-                    os.remove(self.temp_image_path)
-                except:
-                    pass
-            
-            # Save new capture
-            self.temp_image_path = str(temp_dir / "camera_capture.jpg")
-            cv2.imwrite(self.temp_image_path, cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR))
-            
-            # Update GUI with captured image
-            self.root.after(0, lambda: self.load_image(self.temp_image_path))
-            logger.info(f"Auto-capture: Frame saved to {self.temp_image_path}")
+            # A grayscale frame is passed on as-is: Tk displays it directly and
+            # analyze_board converts it to 3 channels after downscaling
             
-            # Step 2: Analyze with Claude
-            self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Analyzing with Claude..."))
-            logger.info("Auto-capture: Starting VLM analysis")
+            # Update GUI with captured image; the frame stays in memory for
+            # display and analysis, so nothing is written to disk
+            self.root.after(0, lambda f=rgb_frame: self.load_image("auto_capture.jpg", f))
+            logger.info("Auto-capture: Frame captured")
             
-            # Get previous result for context (thread-safe access)
-            previous_result = self.last_result
-            result = self.vlm_client.analyze_board(self.temp_image_path, previous_result=previous_result)
+            # Steps 2-3 run on the analysis worker; returning here lets the next
+            # capture start while the Claude call is still in flight
+            self._last_gate_frame = _gate_thumbnail(rgb_frame)
+            self._submit_for_analysis(rgb_frame)
             
-            # Update GUI with results
-            self.root.after(0, lambda: self._display_results(result))
-            logger.info("Auto-capture: Analysis completed")
+        except Exception as e:
+            self._log_loop_error("Auto-capture cycle error", e)
+            self.root.after(0, lambda: self.status_label.config(
+                text=f"Auto-capture error: {e}. Retrying in 5s..."
+            ))
+    
+    def _submit_for_analysis(self, rgb_frame: Optional[np.ndarray]):
+        """Queue a frame for the analysis worker, replacing any frame still
+        waiting (only the newest capture is worth analyzing). None stops the worker."""
+        try:
+            self._analysis_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._analysis_queue.put_nowait(rgb_frame)
+        except queue.Full:
+            logger.warning("Auto-capture: analysis queue busy, dropping frame")
+    
+    def _analysis_worker(self):
+        """Analyze queued auto-capture frames: Claude -> display -> post."""
+        while True:
+            rgb_frame = self._analysis_queue.get()
+            if rgb_frame is None:
+                return
             
-            # Step 3: Post to backend
-            if result and _REQUESTS_AVAILABLE:
-                self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Posting to backend..."))
-                logger.info("Auto-capture: Posting to backend")
+            try:
+                # Step 2: Analyze with Claude
+                self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Analyzing with Claude..."))
+                logger.info("Auto-capture: Starting VLM analysis")
                 
-                backend_data = self._transform_to_backend_format(result)
+                # Get previous result for context (thread-safe access)
+                with self._result_lock:
+                    previous_result = self.last_result
+                result = self.vlm_client.analyze_board(rgb_frame, previous_result=previous_result)
                 
-                try:
-                    # Use dedicated session for update-data requests
-                    if self.data_session is None:
-                        response = requests.post(
-                            self.backend_url,
-                            json=backend_data,
-                            headers={"Content-Type": "application/json"},
-                            timeout=10.0
-                        )
-                    else:
-                        response = self.data_session.post(
-                            self.backend_url,
-                            json=backend_data,
-                            headers={"Content-Type": "application/json"},
-                            timeout=10.0
-                        )
-                    response.raise_for_status()
-                    logger.info(f"Auto-capture: Posted to backend successfully (Status: {response.status_code})")
-                    self.root.after(0, lambda: self.status_label.config(
-                        text=f"Auto-capture complete! Posted to backend. Next capture in 5s..."
-                    ))
-                except Exception as e:
-                    logger.error(f"Auto-capture: Failed to post to backend: {e}")
+                # Update GUI with results
+                self.root.after(0, lambda r=result: self._display_results(r))
+                logger.info("Auto-capture: Analysis completed")
+                
+                # Step 3: Post to backend
+                if result and _REQUESTS_AVAILABLE:
+                    self.root.after(0, lambda: self.status_label.config(text="Auto-capture: Posting to backend..."))
+                    logger.info("Auto-capture: Posting to backend")
+                
+                    # Posts run on their own worker (in order) so the next
+                    # queued frame's analysis can start during the request
+                    self._post_pool.submit(self._auto_post, result)
+                else:
                     self.root.after(0, lambda: self.status_label.config(
-                        text=f"Auto-capture: Analysis complete but post failed. Next capture in 5s..."
+                        text=f"Auto-capture complete! Next capture in 5s..."
                     ))
-            else:
-                self.root.after(0, lambda: self.status_label.config(
-                    text=f"Auto-capture complete! Next capture in 5s..."
-                ))
             
+            except Exception as e:
+                # Let the next capture of this board be analyzed again
+                self._last_gate_frame = None
+                self._log_loop_error("Auto-capture analysis error", e)
+                self.root.after(0, lambda e=e: self.status_label.config(
+                    text=f"Auto-capture error: {e}. Retrying in 5s..."
+                ))
+    
+    def _log_loop_error(self, context: str, e: Exception, interval: float = 60.0):
+        """Log an error from a background loop, with the full traceback only when
+        the error changes or once per interval; repeats get a one-line warning."""
+        key = (context, type(e), str(e))
+        now = time.monotonic()
+        last_key, last_time = self._last_loop_error
+        if key != last_key or now - last_time >= interval:
+            self._last_loop_error = (key, now)
+            logger.error("%s: %s", context, e, exc_info=True)
+        else:
+            logger.warning("%s: %s", context, e)
+    
+    def _auto_post(self, result: Dict):
+        """Post one auto-capture result to the backend (runs on _post_pool)."""
+        backend_data, body = self._backend_payload(result)
+        try:
+            # Use dedicated session for update-data requests
+            response = self._post_json(body)
+            response.raise_for_status()
+            logger.info(f"Auto-capture: Posted to backend successfully (Status: {response.status_code})")
+            self.root.after(0, lambda: self.status_label.config(
+                text=f"Auto-capture complete! Posted to backend. Next capture in 5s..."
+            ))
         except Exception as e:
-            logger.error(f"Auto-capture cycle error: {e}", exc_info=True)
+            logger.error(f"Auto-capture: Failed to post to backend: {e}")
             self.root.after(0, lambda: self.status_label.config(
-                text=f"Auto-capture error: {e}. Retrying in 5s..."
+                text=f"Auto-capture: Analysis complete but post failed. Next capture in 5s..."
             ))
     
     def _toggle_publisher(self):
@@ -1143,7 +2268,7 @@ class TileExtractorGUI:
         
         if self.publisher_running:
             # Stop publisher
-            self.publisher_running = False
+            self._publisher_stop.set()
             if self.publisher_thread and self.publisher_thread.is_alive():
                 # Wait a bit for thread to finish
                 self.publisher_thread.join(timeout=2.0)
@@ -1152,7 +2277,7 @@ class TileExtractorGUI:
             logger.info("Tile publisher stopped")
         else:
             # Start publisher
-            self.publisher_running = True
+            self._publisher_stop.clear()
             self.publisher_btn.config(text="Stop Tile Publisher", bg="#F44336")
             self.status_label.config(text="Tile publisher started. Publishing every second...")
             logger.info("Tile publisher started")
@@ -1163,6 +2288,7 @@ class TileExtractorGUI:
     def _publisher_loop(self):
         """Publisher loop: capture frame and publish to backend."""
         interval = 1.0  # seconds between captures
+        gray_buf = None
         
         while self.publisher_running:
             try:
@@ -1174,23 +2300,30 @@ class TileExtractorGUI:
                 rgb_frame = self.oak.get_rgb()
                 if rgb_frame is None:
                     logger.warning("Publisher: Failed to capture frame")
-                    time.sleep(interval)
+                    self._publisher_stop.wait(interval)
                     continue
                 
-                # Convert RGB to BGR for publisher (publisher expects BGR)
-                bgr_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR)
+                # The publisher works in grayscale: convert straight from RGB
+                # (one pass instead of RGB->BGR->gray); publish() is done with
+                # the frame when it returns, so one buffer serves every cycle
+                if rgb_frame.ndim == 2:
+                    gray_frame = rgb_frame
+                else:
+                    if gray_buf is None or gray_buf.shape != rgb_frame.shape[:2]:
+                        gray_buf = np.empty(rgb_frame.shape[:2], dtype=rgb_frame.dtype)
+                    gray_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY, dst=gray_buf)
                 
                 # Publish to backend
-                self.tile_publisher.publish(bgr_frame)
+                self.tile_publisher.publish(gray_frame, is_gray=True)
                 
                 logger.info("Publisher: Frame published to backend")
                 
                 # Wait for next cycle
-                time.sleep(interval)
+                self._publisher_stop.wait(interval)
                 
             except Exception as e:
-                logger.error(f"Publisher loop error: {e}", exc_info=True)
-                time.sleep(interval)
+                self._log_loop_error("Publisher loop error", e)
+                self._publisher_stop.wait(interval)
         
         logger.info("Publisher loop stopped")
     
@@ -1199,13 +2332,10 @@ class TileExtractorGUI:
         # Set up window close handler
         def on_closing():
             # Stop auto-capture if running
-            if self.auto_capture_running:
-                self.auto_capture_running = False
-                if self.auto_capture_timer:
-                    self.auto_capture_timer.cancel()
+            self._auto_stop.set()
             # Stop publisher if running
             if self.publisher_running:
-                self.publisher_running = False
+                self._publisher_stop.set()
                 if self.publisher_thread and self.publisher_thread.is_alive():
                     self.publisher_thread.join(timeout=2.0)
             # Cleanup
@@ -1233,12 +2363,9 @@ class TileExtractorGUI:
             self.root.mainloop()
         finally:
             # Cleanup
-            if self.auto_capture_running:
-                self.auto_capture_running = False
-                if self.auto_capture_timer:
-                    self.auto_capture_timer.cancel()
+            self._auto_stop.set()
             if self.publisher_running:
-                self.publisher_running = False
+                self._publisher_stop.set()
                 if self.publisher_thread and self.publisher_thread.is_alive():
                     self.publisher_thread.join(timeout=2.0)
             if self.temp_image_path and os.path.exists(self.temp_image_path):
@@ -1,12 +1,24 @@
 from extract_tiles import TileExtractor
 from process_image import ImageProcessor
 import requests
+import importlib.util
 import logging
 import cv2
 import numpy as np
-import base64
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    _SCIPY_AVAILABLE = True
+except ImportError:
+    _SCIPY_AVAILABLE = False
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -14,65 +26,124 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TilePublisher():
+    # The published frame is only a dashboard preview: cap its width and quality
+    PREVIEW_MAX_WIDTH = 1280
+    PREVIEW_QUALITY = 75
+    # Fraction of _crop_tile's padded square that _is_blank inspects: the
+    # center 70% is resized to 80 px inside a 24 px border (128 px), and the
+    # center half of that is 64 px, i.e. 0.7 * 64 / 80
+    BLANK_WINDOW = 0.56
+
     def __init__(self) -> None: 
         self.backend_url = "http://localhost:3000/update-image"
-        # Create a dedicated session for update-image requests to avoid connection interference
+        # Create a dedicated client for update-image requests to avoid connection interference
         # with update-data requests
-        self.image_session = requests.Session()
-        # Set connection pool size to ensure isolation from data requests
-        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
-        self.image_session.mount('http://', adapter)
+        if httpx is not None:
+            # Persistent keep-alive pool; multiplexed HTTP/2 when h2 is installed
+            # and the backend is served over https (plain http stays on HTTP/1.1)
+            self.image_client = httpx.Client(
+                http2=importlib.util.find_spec("h2") is not None,
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            )
+        else:
+            self.image_client = requests.Session()
+            # Set connection pool size to ensure isolation from data requests
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            self.image_client.mount('http://', adapter)
+            self.image_client.mount('https://', adapter)
+        # Uploads run here so publish() never waits on the backend; a frame
+        # is dropped if the previous upload is still in flight
+        self._upload_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tile-pub-upload")
+        self._inflight = None
         
 
-    def publish(self, frame):
-        frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def publish(self, frame, is_gray=False):
+        """Detect and cluster tiles in a frame, upload the annotated preview
+        and return it. Pass is_gray=True for a frame that is already
+        single-channel to skip the BGR->gray conversion."""
+        frame_gray = frame if is_gray else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         tiles = self.extract_tiles(frame_gray)
         tiles = self.remove_blank_tiles(frame_gray, tiles)
         bboxes = self.cluster_tiles(tiles)
         img = self.annotate_image(frame_gray, bboxes)
         
-        # Convert image to base64 for JSON serialization
-        _, buffer = cv2.imencode('.jpg', img)
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
+        # Downscale the preview before JPEG encoding, which scales with pixel count
+        h, w = img.shape[:2]
+        preview = img
+        if w > self.PREVIEW_MAX_WIDTH:
+            preview = cv2.resize(img, (self.PREVIEW_MAX_WIDTH, int(h * self.PREVIEW_MAX_WIDTH / w)),
+                                 interpolation=cv2.INTER_AREA)
         
+        # Send the JPEG bytes as-is; the backend takes raw octet-stream bodies
+        _, buffer = cv2.imencode('.jpg', preview, [cv2.IMWRITE_JPEG_QUALITY, self.PREVIEW_QUALITY])
+        
+        if self._inflight is None or self._inflight.done():
+            self._inflight = self._upload_pool.submit(self._do_post, buffer.tobytes())
+        else:
+            logger.debug("Publisher: Previous upload still in flight, dropping frame")
+        
+        # Return the annotated image so it can be displayed in the stream
+        return img
+            
+
+    def _do_post(self, body):
+        """Upload one frame (runs on the upload pool)."""
         try:
-            # Use dedicated session for update-image requests to avoid interference with update-data
-            response = self.image_session.post(
-                self.backend_url,
-                json={"base64": img_base64},
-                headers={"Content-Type": "application/json"},
-                timeout=10.0
-            )
+            # Use dedicated client for update-image requests to avoid interference with update-data
+            response = self._post_image(body)
             response.raise_for_status()
             logger.info(f"Publisher: Posted image to backend successfully (Status: {response.status_code})")
             
         except Exception as e:
             logger.error(f"Publisher: Failed to post image to backend: {e}")
-        
-        # Return the annotated image so it can be displayed in the stream
-        return img
-            
+
+    def _post_image(self, body):
+        """POST JPEG bytes to the backend on the dedicated image client."""
+        headers = {"Content-Type": "application/octet-stream"}
+        if httpx is not None:
+            return self.image_client.post(self.backend_url, content=body, headers=headers)
+        return self.image_client.post(self.backend_url, data=body, headers=headers, timeout=10.0)
 
     def extract_tiles(self, frame):
         return TileExtractor._detect_tiles(frame)
 
-    def remove_blank_tiles(self, frame, tiles):
-        """Remove blank tiles in parallel."""
+    def remove_blank_tiles(self, frame, tiles, pad=6):
+        """Remove blank tiles (ImageProcessor._is_blank's rule) in one pass.
+        
+        Instead of warping a crop per tile, ink is thresholded once for the
+        whole frame and each tile's dark ratio is counted directly over the
+        frame region that _is_blank's window covers: the center
+        BLANK_WINDOW of _crop_tile's padded square, rotated with the tile.
+        """
         if not tiles:
             return []
         
-        def check_tile(tile):
-            """Check if a single tile is blank."""
-            crop = ImageProcessor._crop_tile(frame, tile)
-            return tile if not ImageProcessor._is_blank(crop) else None
-        
-        # Process tiles in parallel
-        with ThreadPoolExecutor() as executor:
-            results = executor.map(check_tile, tiles)
-            # Filter out None values (blank tiles)
-            tile_arr = [tile for tile in results if tile is not None]
-        
-        return tile_arr
+        ink = (frame < ImageProcessor.INK_THRESHOLD).view(np.uint8)
+        h_img, w_img = frame.shape[:2]
+        kept = []
+        for tile in tiles:
+            (cx, cy), (w, h), angle = tile
+            side = max(w, h)
+            if min(w, h) <= 0:
+                continue
+            # _crop_tile maps the rect onto side x side pixels inside a pad
+            # border, so one crop pixel spans w/side (h/side) frame pixels
+            half = self.BLANK_WINDOW * (side + 2 * pad) / 2
+            quad = cv2.boxPoints(((cx, cy), (2 * half * w / side, 2 * half * h / side), angle))
+            x0, y0 = np.floor(quad.min(axis=0)).astype(int)
+            x1, y1 = np.ceil(quad.max(axis=0)).astype(int) + 1
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, w_img), min(y1, h_img)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.fillConvexPoly(mask, np.rint(quad - (x0, y0)).astype(np.int32), 1)
+            area = np.count_nonzero(mask)
+            dark = np.count_nonzero(ink[y0:y1, x0:x1] & mask)
+            if area and dark / area >= ImageProcessor.BLACK_PIXEL_THRESH:
+                kept.append(tile)
+        return kept
 
     def cluster_tiles(self, tiles):
         """Cluster adjacent tiles into larger bounding boxes.
@@ -86,100 +157,99 @@ class TilePublisher():
         if not tiles:
             return []
         
-        # Convert rotated rects to axis-aligned bounding boxes for distance checking
-        def get_bbox_points(rect):
-            """Get the 4 corner points of a rotated rectangle."""
-            box = cv2.boxPoints(rect)
-            return box
+        # Corner points, centers and mean side length of every tile, computed once
+        boxes = np.stack([cv2.boxPoints(rect) for rect in tiles]).astype(np.float32)  # (N, 4, 2)
+        centers = np.array([rect[0] for rect in tiles], dtype=np.float32)  # (N, 2)
+        sizes = np.array([(rect[1][0] + rect[1][1]) / 2 for rect in tiles], dtype=np.float32)  # (N,)
+        adjacent = self._adjacency_matrix(boxes, centers, sizes)
         
-        def are_adjacent(rect1, rect2, threshold_factor=0.35):
-            """Check if two rectangles are adjacent/close to each other.
-            
-            Args:
-                rect1, rect2: RotatedRect tuples
-                threshold_factor: Multiplier for determining adjacency threshold (much tighter now)
-                
-            Returns:
-                True if rectangles are adjacent
-            """
-            # Get bounding boxes
-            box1 = get_bbox_points(rect1)
-            box2 = get_bbox_points(rect2)
-            
-            # Calculate average width/height for threshold
-            w1, h1 = rect1[1]
-            w2, h2 = rect2[1]
-            avg_size = (w1 + h1 + w2 + h2) / 4
-            
-            # Check if any point of box1 is close to any point of box2
-            # or if the bounding boxes overlap/are close
-            min_dist = float('inf')
-            for p1 in box1:
-                for p2 in box2:
-                    dist = np.linalg.norm(p1 - p2)
-                    min_dist = min(min_dist, dist)
-            
-            # Also check center-to-center distance
-            cx1, cy1 = rect1[0]
-            cx2, cy2 = rect2[0]
-            center_dist = np.sqrt((cx1 - cx2)**2 + (cy1 - cy2)**2)
-            
-            # Tiles are adjacent if they're within threshold_factor * avg_size distance
-            # Using much tighter threshold (0.35 instead of 1.5)
-            threshold = avg_size * threshold_factor
-            return min_dist < threshold or center_dist < threshold * 1.2
-        
-        # Simple clustering: group adjacent tiles
-        clusters = []
-        used = [False] * len(tiles)
-        
-        for i, tile in enumerate(tiles):
-            if used[i]:
-                continue
-            
-            # Start a new cluster with this tile
-            cluster = [tile]
-            used[i] = True
-            
-            # Find all tiles adjacent to any tile in this cluster
-            changed = True
-            while changed:
-                changed = False
-                for j, other_tile in enumerate(tiles):
-                    if used[j]:
-                        continue
-                    
-                    # Check if this tile is adjacent to any tile in the cluster
-                    for cluster_tile in cluster:
-                        if are_adjacent(cluster_tile, other_tile):
-                            cluster.append(other_tile)
-                            used[j] = True
-                            changed = True
-                            break
-            
-            clusters.append(cluster)
+        # Clusters are the connected components of the adjacency graph
+        if _SCIPY_AVAILABLE:
+            n_comp, labels = connected_components(csr_matrix(adjacent), directed=False)
+            clusters = [[] for _ in range(n_comp)]
+            for i, label in enumerate(labels):
+                clusters[label].append(i)
+        else:
+            clusters = self._flood_components(adjacent)
         
         # For each cluster, compute the bounding box that contains all tiles
         clustered_bboxes = []
         for cluster in clusters:
             if len(cluster) == 1:
                 # Single tile, keep as is
-                clustered_bboxes.append(cluster[0])
+                clustered_bboxes.append(tiles[cluster[0]])
             else:
-                # Multiple tiles: compute bounding box containing all
-                all_points = []
-                for rect in cluster:
-                    box_points = get_bbox_points(rect)
-                    all_points.extend(box_points)
-                
-                all_points = np.array(all_points, dtype=np.float32)
-                
-                # Compute minimum area rectangle containing all points
+                # Multiple tiles: minimum area rectangle containing all corners
+                all_points = boxes[cluster].reshape(-1, 2)
                 rect = cv2.minAreaRect(all_points)
                 clustered_bboxes.append(rect)
         
         return clustered_bboxes
 
+    @staticmethod
+    def _flood_components(adjacent):
+        """Connected components of an (N, N) adjacency matrix without SciPy."""
+        clusters = []
+        used = [False] * len(adjacent)
+        
+        for i in range(len(adjacent)):
+            if used[i]:
+                continue
+            
+            # Start a new cluster with this tile and flood out along adjacency
+            cluster = [i]
+            used[i] = True
+            stack = [i]
+            while stack:
+                k = stack.pop()
+                for j in np.flatnonzero(adjacent[k]):
+                    if not used[j]:
+                        used[j] = True
+                        cluster.append(j)
+                        stack.append(j)
+            
+            clusters.append(cluster)
+        return clusters
+
+    @staticmethod
+    def _adjacency_matrix(boxes, centers, sizes, threshold_factor=0.35):
+        """Pairwise adjacency of all tiles at once.
+        
+        Args:
+            boxes: (N, 4, 2) corner points of each tile
+            centers: (N, 2) tile centers
+            sizes: (N,) mean of each tile's width and height
+            threshold_factor: Multiplier on the pair's average size (much tighter now)
+            
+        Returns:
+            (N, N) bool matrix; two tiles are adjacent if any pair of their
+            corners, or their centers (with 1.2x slack), are within
+            threshold_factor * average size of each other
+        """
+        n = len(boxes)
+        # Using much tighter threshold (0.35 instead of 1.5)
+        threshold = (sizes[:, None] + sizes[None, :]) / 2 * threshold_factor
+        
+        # Axis-aligned boxes further apart than the looser (center) threshold
+        # on either axis cannot be adjacent; only the remaining pairs get the
+        # 16 corner distances
+        lo, hi = boxes.min(axis=1), boxes.max(axis=1)  # (N, 2)
+        gap = np.maximum(lo[:, None] - hi[None, :], lo[None, :] - hi[:, None]).max(-1)
+        i, j = np.nonzero(np.triu(gap <= threshold * 1.2, k=1))
+        
+        # Closest corner pair of each candidate pair: (M, 4, 1, 2) - (M, 1, 4, 2).
+        # Distances stay squared and are compared to squared thresholds (no sqrt)
+        diff = boxes[i][:, :, None, :] - boxes[j][:, None, :, :]
+        min_corner_sq = (diff * diff).sum(-1).reshape(len(i), 16).min(-1)
+        d = centers[i] - centers[j]
+        center_dist_sq = (d * d).sum(-1)
+        
+        threshold_sq = threshold[i, j] ** 2
+        close = (min_corner_sq < threshold_sq) | (center_dist_sq < threshold_sq * 1.44)
+        adjacent = np.zeros((n, n), dtype=bool)
+        adjacent[i[close], j[close]] = True
+        return adjacent | adjacent.T
+
     def annotate_image(self, frame, bboxes):
         return TileExtractor._draw_boxes(frame, bboxes)
     
@@ -188,8 +258,9 @@ def main():
 
     ## Testing harness
     pubber = TilePublisher()
-    frame = cv2.imread("pirate.jpg")
-    pubber.publish(frame)
+    frame = cv2.imread("pirate.jpg", cv2.IMREAD_GRAYSCALE)
+    pubber.publish(frame, is_gray=True)
+    pubber._upload_pool.shutdown(wait=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
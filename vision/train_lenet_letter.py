@@ -6,14 +6,21 @@ Augmentation: ±5° rotation, small translation, mild brightness/contrast. Eval:
 
 import os
 import sys
+import json
 import argparse
 import numpy as np
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, random_split, Subset
-from torchvision import transforms, datasets
+from torch.utils.data import DataLoader, Dataset, random_split, Subset
+from torchvision import datasets
+from torchvision.io import read_image, ImageReadMode
+from torchvision.transforms import v2
 import cv2
-from PIL import Image
+
+try:
+    import lmdb
+except ImportError:
+    lmdb = None
 
 from lenet_letter import LeNetLetter, LETTERS, NUM_CLASSES, INPUT_SIZE
 
@@ -26,61 +33,89 @@ EPOCHS = 500
 LR = 1e-3
 VAL_FRAC = 0.2
 EARLY_STOP_PATIENCE = 70  # stop if no val improvement for this many epochs
+NUM_WORKERS = min(8, os.cpu_count() or 1)  # DataLoader processes for decode + augmentation
+
+
+# --------------- Loading: decode straight to uint8 tensors (no PIL) ---------------
+def read_gray(path):
+    """Decode an image file to a 1xHxW uint8 grayscale tensor."""
+    return read_image(path, ImageReadMode.GRAY)
+
+
+class LmdbLetterDataset(Dataset):
+    """letter_data packed by pack_letter_data.py: one memory-mapped file instead
+    of a open()/read() per sample per epoch. Exposes classes/class_to_idx like
+    ImageFolder and yields the same 1xHxW uint8 tensors as read_gray."""
+
+    def __init__(self, path, transform=None):
+        self.path = path
+        self.transform = transform
+        env = lmdb.open(path, readonly=True, lock=False, subdir=False)
+        with env.begin() as txn:
+            self.classes = json.loads(txn.get(b"__classes__"))
+            self._len = int(txn.get(b"__len__"))
+        env.close()
+        self.class_to_idx = {c: i for i, c in enumerate(self.classes)}
+        self._env = None
+        self._pid = None
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        # An LMDB environment must not cross fork(): each worker opens its own
+        if self._env is None or self._pid != os.getpid():
+            self._env = lmdb.open(self.path, readonly=True, lock=False, subdir=False, readahead=False, meminit=False)
+            self._pid = os.getpid()
+        with self._env.begin(buffers=True) as txn:
+            record = txn.get(f"{index:08d}".encode())
+            label = record[0]
+            arr = cv2.imdecode(np.frombuffer(record, np.uint8, offset=1), cv2.IMREAD_GRAYSCALE)
+        img = torch.from_numpy(arr).unsqueeze(0)
+        if self.transform is not None:
+            img = self.transform(img)
+        return img, label
 
 
 # --------------- Preprocessing: optional adaptive threshold ---------------
-def adaptive_thresh_pil(pil_img):
-    """Apply adaptive threshold to PIL image; return PIL (grayscale)."""
-    arr = np.array(pil_img)
-    if arr.ndim == 3:
-        arr = np.mean(arr, axis=2).astype(np.uint8)
+def adaptive_thresh(img):
+    """Apply adaptive threshold to a 1xHxW uint8 tensor; return the same layout."""
+    arr = img[0].numpy()  # view of the tensor's buffer
     block = min(31, (min(arr.shape) // 4) | 1)
     arr = cv2.adaptiveThreshold(
         arr, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
         cv2.THRESH_BINARY, block, 8
     )
-    return Image.fromarray(arr)
-
-
-class ToTensorNormalize:
-    """Convert PIL to tensor and normalize to [0, 1]."""
-
-    def __call__(self, pil):
-        arr = np.array(pil, dtype=np.float32)
-        if arr.ndim == 3:
-            arr = np.mean(arr, axis=2)
-        arr = arr / 255.0
-        return torch.from_numpy(arr).unsqueeze(0)
+    return torch.from_numpy(arr).unsqueeze(0)
 
 
 # --------------- Dataset: center crop, resize 32×32 ---------------
+# Inputs are 1xHxW uint8 tensors from read_gray; ToDtype(scale=True) maps to [0, 1]
 def get_train_transform(use_adaptive_thresh=False, image_size=IMAGE_SIZE):
     t = [
-        transforms.Grayscale(num_output_channels=1),
-        transforms.Resize((image_size, image_size)),
-        transforms.CenterCrop(image_size),
+        v2.Resize((image_size, image_size), antialias=True),
+        v2.CenterCrop(image_size),
     ]
     if use_adaptive_thresh:
-        t.insert(1, transforms.Lambda(lambda x: adaptive_thresh_pil(x)))
+        t.insert(0, v2.Lambda(adaptive_thresh))
     t.extend([
-        transforms.RandomRotation(5, fill=255),
-        transforms.RandomAffine(degrees=0, translate=(0.05, 0.05), fill=255),
-        transforms.ColorJitter(brightness=0.15, contrast=0.15),
-        ToTensorNormalize(),
+        v2.RandomRotation(5, fill=255),
+        v2.RandomAffine(degrees=0, translate=(0.05, 0.05), fill=255),
+        v2.ColorJitter(brightness=0.15, contrast=0.15),
+        v2.ToDtype(torch.float32, scale=True),
     ])
-    return transforms.Compose(t)
+    return v2.Compose(t)
 
 
 def get_val_transform(use_adaptive_thresh=False, image_size=IMAGE_SIZE):
     t = [
-        transforms.Grayscale(num_output_channels=1),
-        transforms.Resize((image_size, image_size)),
-        transforms.CenterCrop(image_size),
-        ToTensorNormalize(),
+        v2.Resize((image_size, image_size), antialias=True),
+        v2.CenterCrop(image_size),
+        v2.ToDtype(torch.float32, scale=True),
     ]
     if use_adaptive_thresh:
-        t.insert(1, transforms.Lambda(lambda x: adaptive_thresh_pil(x)))
-    return transforms.Compose(t)
+        t.insert(0, v2.Lambda(adaptive_thresh))
+    return v2.Compose(t)
 
 
 # --------------- Sanity checks ---------------
@@ -121,21 +156,34 @@ def main():
     ap.add_argument("--batch", type=int, default=BATCH_SIZE)
     ap.add_argument("--patience", type=int, default=EARLY_STOP_PATIENCE, help="Early stop if no val improvement for this many epochs")
     ap.add_argument("--no-adaptive", action="store_true", help="Disable adaptive thresholding (default: on for consistent contrast)")
+    ap.add_argument("--lmdb", default=None, help="Read samples from an LMDB built by pack_letter_data.py instead of --data")
     args = ap.parse_args()
     use_adaptive = not args.no_adaptive
 
-    if not os.path.isdir(args.data):
-        print("Data dir not found:", args.data)
-        return 1
+    if args.lmdb:
+        if lmdb is None:
+            print("lmdb package not installed. Install with: pip install lmdb")
+            return 1
+        if not os.path.isfile(args.lmdb):
+            print("LMDB not found:", args.lmdb, "(run pack_letter_data.py first)")
+            return 1
+    else:
+        if not os.path.isdir(args.data):
+            print("Data dir not found:", args.data)
+            return 1
+        for letter in LETTERS:
+            os.makedirs(os.path.join(args.data, letter), exist_ok=True)
     if use_adaptive:
         print("Using adaptive thresholding for consistent contrast.")
-    for letter in LETTERS:
-        os.makedirs(os.path.join(args.data, letter), exist_ok=True)
 
     train_tf = get_train_transform(use_adaptive_thresh=use_adaptive)
     val_tf = get_val_transform(use_adaptive_thresh=use_adaptive)
-    full_ds = datasets.ImageFolder(args.data, transform=train_tf)
-    val_ds = datasets.ImageFolder(args.data, transform=val_tf)
+    if args.lmdb:
+        full_ds = LmdbLetterDataset(args.lmdb, transform=train_tf)
+        val_ds = LmdbLetterDataset(args.lmdb, transform=val_tf)
+    else:
+        full_ds = datasets.ImageFolder(args.data, transform=train_tf, loader=read_gray)
+        val_ds = datasets.ImageFolder(args.data, transform=val_tf, loader=read_gray)
     n = len(full_ds)
     if n == 0:
         print("No images in letter_data. Add images to A/, B/, ..., Z/.")
@@ -148,15 +196,29 @@ def main():
         print(f"Small dataset ({n} samples): using 10% for validation to maximize training data.")
     train_sub, val_sub = random_split(full_ds, [n_train, n_val], generator=torch.Generator().manual_seed(42))
     val_subset = Subset(val_ds, val_sub.indices)
-    train_loader = DataLoader(train_sub, batch_size=args.batch, shuffle=True, num_workers=0)
-    val_loader = DataLoader(val_subset, batch_size=args.batch, shuffle=False, num_workers=0)
+    use_cuda = torch.cuda.is_available()
+    # Workers prepare the next batches while the current one trains; kept alive across epochs
+    loader_kw = dict(num_workers=NUM_WORKERS, pin_memory=use_cuda, persistent_workers=True, prefetch_factor=4)
+    # A short final batch would change the input shape and force the compiled
+    # graph to be recaptured; dropped whenever a full batch remains
+    train_loader = DataLoader(train_sub, batch_size=args.batch, shuffle=True,
+                              drop_last=len(train_sub) > args.batch, **loader_kw)
+    val_loader = DataLoader(val_subset, batch_size=args.batch, shuffle=False, **loader_kw)
 
     sanity_checks(args.data, train_sub, val_subset, full_ds.class_to_idx)
 
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    device = torch.device("cuda" if use_cuda else "cpu")
     model = LeNetLetter(num_classes=NUM_CLASSES, input_size=IMAGE_SIZE).to(device)
+    # Compiled graph (fused ops, no per-op Python dispatch) for every forward
+    # pass; it shares parameters with model, whose state_dict is what gets saved.
+    # CUDA graphs (reduce-overhead) only pay off on the GPU
+    compile_mode = "reduce-overhead" if device.type == "cuda" else None
+    compiled_model = torch.compile(model, mode=compile_mode) if hasattr(torch, "compile") else model
     opt = torch.optim.Adam(model.parameters(), lr=args.lr)
     criterion = nn.CrossEntropyLoss()
+    # Mixed precision on CUDA (fp16 with loss scaling); a no-op on CPU
+    use_amp = device.type == "cuda"
+    scaler = torch.amp.GradScaler("cuda", enabled=use_amp)
 
     idx_to_class = {v: k for k, v in full_ds.class_to_idx.items()}
     best_val_acc = 0.0
@@ -167,12 +229,14 @@ def main():
         train_correct, train_total = 0, 0
         train_loss_sum = 0.0
         for x, y in train_loader:
-            x, y = x.to(device), y.to(device)
+            x, y = x.to(device, non_blocking=True), y.to(device, non_blocking=True)
             opt.zero_grad()
-            logits = model(x)
-            loss = criterion(logits, y)
-            loss.backward()
-            opt.step()
+            with torch.autocast(device.type, enabled=use_amp):
+                logits = compiled_model(x)
+                loss = criterion(logits, y)
+            scaler.scale(loss).backward()
+            scaler.step(opt)
+            scaler.update()
             train_loss_sum += loss.item()
             pred = logits.argmax(dim=1)
             train_correct += (pred == y).sum().item()
@@ -182,10 +246,10 @@ def main():
 
         model.eval()
         val_correct, val_total = 0, 0
-        with torch.no_grad():
+        with torch.no_grad(), torch.autocast(device.type, enabled=use_amp):
             for x, y in val_loader:
-                x, y = x.to(device), y.to(device)
-                logits = model(x)
+                x, y = x.to(device, non_blocking=True), y.to(device, non_blocking=True)
+                logits = compiled_model(x)
                 pred = logits.argmax(dim=1)
                 val_correct += (pred == y).sum().item()
                 val_total += y.size(0)
@@ -209,32 +273,31 @@ def main():
         model.load_state_dict(torch.load(args.out, map_location=device, weights_only=True))
     model.eval()
     all_pred, all_true = [], []
-    with torch.no_grad():
+    with torch.no_grad(), torch.autocast(device.type, enabled=use_amp):
         for x, y in val_loader:
-            x = x.to(device)
-            logits = model(x)
+            x = x.to(device, non_blocking=True)
+            logits = compiled_model(x)
             pred = logits.argmax(dim=1)
             all_pred.extend(pred.cpu().numpy().tolist())
             all_true.extend(y.numpy().tolist())
-    all_pred = np.array(all_pred)
-    all_true = np.array(all_true)
+    all_pred = np.array(all_pred, dtype=np.int64)
+    all_true = np.array(all_true, dtype=np.int64)
+
+    # Confusion matrix (26x26), one bincount over flattened (true, pred) pairs
+    cm = np.bincount(all_true * NUM_CLASSES + all_pred, minlength=NUM_CLASSES * NUM_CLASSES).reshape(NUM_CLASSES, NUM_CLASSES)
 
     # Per-class accuracy
     print("Per-class accuracy (val set):")
+    support = cm.sum(axis=1)
+    per_class = cm.diagonal() / np.maximum(support, 1)
     for c in range(NUM_CLASSES):
-        mask = all_true == c
-        if mask.sum() == 0:
+        if support[c] == 0:
             print(f"  {idx_to_class[c]}: no samples")
             continue
-        acc = (all_pred[mask] == c).mean()
-        print(f"  {idx_to_class[c]}: {acc:.2%} (n={mask.sum()})")
+        print(f"  {idx_to_class[c]}: {per_class[c]:.2%} (n={support[c]})")
     overall = (all_pred == all_true).mean()
     print(f"Overall val accuracy: {overall:.2%}")
 
-    # Confusion matrix (26x26)
-    cm = np.zeros((NUM_CLASSES, NUM_CLASSES), dtype=np.int64)
-    for t, p in zip(all_true, all_pred):
-        cm[t, p] += 1
     print("\nConfusion matrix (rows=true, cols=pred):")
     print("   " + " ".join(idx_to_class[i] for i in range(NUM_CLASSES)))
     for i in range(NUM_CLASSES):
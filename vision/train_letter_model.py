@@ -5,7 +5,9 @@ import argparse
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader, random_split, Subset
-from torchvision import transforms, datasets
+from torchvision import datasets
+from torchvision.io import read_image, ImageReadMode
+from torchvision.transforms import v2
 
 from letter_cnn import LetterCNN, NUM_CLASSES, LETTERS, DEFAULT_MODEL_PATH
 
@@ -19,6 +21,12 @@ VAL_FRAC = 0.15
 EARLY_STOP_PATIENCE = 70  # stop if no val improvement for this many epochs (reset when LR is reduced)
 SCHEDULER_PATIENCE = 15   # epochs without val improvement before reducing LR
 GRAD_CLIP = 1.0           # max gradient norm to reduce overshoot
+NUM_WORKERS = min(8, os.cpu_count() or 1)  # DataLoader processes for decode + augmentation
+
+
+def read_gray(path):
+    """Decode an image file to a 1xHxW uint8 grayscale tensor (no PIL)."""
+    return read_image(path, ImageReadMode.GRAY)
 
 
 def main():
@@ -39,24 +47,23 @@ def main():
     for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
         os.makedirs(os.path.join(args.data, letter), exist_ok=True)
 
-    train_transform = transforms.Compose([
-        transforms.Grayscale(num_output_channels=1),
-        transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
-        transforms.RandomRotation(15, fill=255),
-        transforms.RandomAffine(degrees=0, translate=(0.1, 0.1), fill=255),
-        transforms.ColorJitter(brightness=0.35, contrast=0.35),
-        transforms.ToTensor(),
-        transforms.Normalize([0.5], [0.5]),
+    # Inputs are 1xHxW uint8 tensors from read_gray
+    train_transform = v2.Compose([
+        v2.Resize((INPUT_SIZE, INPUT_SIZE), antialias=True),
+        v2.RandomRotation(15, fill=255),
+        v2.RandomAffine(degrees=0, translate=(0.1, 0.1), fill=255),
+        v2.ColorJitter(brightness=0.35, contrast=0.35),
+        v2.ToDtype(torch.float32, scale=True),
+        v2.Normalize([0.5], [0.5]),
     ])
-    val_transform = transforms.Compose([
-        transforms.Grayscale(num_output_channels=1),
-        transforms.Resize((INPUT_SIZE, INPUT_SIZE)),
-        transforms.ToTensor(),
-        transforms.Normalize([0.5], [0.5]),
+    val_transform = v2.Compose([
+        v2.Resize((INPUT_SIZE, INPUT_SIZE), antialias=True),
+        v2.ToDtype(torch.float32, scale=True),
+        v2.Normalize([0.5], [0.5]),
     ])
 
-    train_ds = datasets.ImageFolder(args.data, transform=train_transform)
-    val_ds = datasets.ImageFolder(args.data, transform=val_transform)
+    train_ds = datasets.ImageFolder(args.data, transform=train_transform, loader=read_gray)
+    val_ds = datasets.ImageFolder(args.data, transform=val_transform, loader=read_gray)
     n = len(train_ds)
     if n == 0:
         print("No images found in letter_data/A, B, ..., Z.")
@@ -76,17 +83,27 @@ def main():
         val_subset = Subset(val_ds, val_sub.indices)
     batch_size = min(BATCH_SIZE, max(4, n_train))
     use_cuda = torch.cuda.is_available()
-    train_loader = DataLoader(train_sub, batch_size=batch_size, shuffle=True, num_workers=0, pin_memory=use_cuda)
-    # Train accuracy for reporting: same indices as train_sub but with fixed (no-augment) transform so it's stable
-    train_eval_ds = Subset(datasets.ImageFolder(args.data, transform=val_transform), train_sub.indices)
-    train_eval_loader = DataLoader(train_eval_ds, batch_size=batch_size, shuffle=False, num_workers=0)
-    val_loader = DataLoader(val_subset, batch_size=batch_size, shuffle=False, num_workers=0) if n_val > 0 else None
-
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    # Workers prepare the next batches while the current one trains; kept alive across epochs
+    loader_kw = dict(num_workers=NUM_WORKERS, pin_memory=use_cuda, persistent_workers=True, prefetch_factor=4)
+    # A short final batch would change the input shape and force the compiled
+    # graph to be recaptured; dropped whenever a full batch remains
+    train_loader = DataLoader(train_sub, batch_size=batch_size, shuffle=True,
+                              drop_last=len(train_sub) > batch_size, **loader_kw)
+    val_loader = DataLoader(val_subset, batch_size=batch_size, shuffle=False, **loader_kw) if n_val > 0 else None
+
+    device = torch.device("cuda" if use_cuda else "cpu")
     model = LetterCNN(num_classes=NUM_CLASSES).to(device)
+    # Compiled graph (fused ops, no per-op Python dispatch) for every forward
+    # pass; it shares parameters with model, whose state_dict is what gets saved.
+    # CUDA graphs (reduce-overhead) only pay off on the GPU
+    compile_mode = "reduce-overhead" if device.type == "cuda" else None
+    compiled_model = torch.compile(model, mode=compile_mode) if hasattr(torch, "compile") else model
     opt = torch.optim.Adam(model.parameters(), lr=args.lr)
     sched = torch.optim.lr_scheduler.ReduceLROnPlateau(opt, mode="max", factor=0.5, patience=SCHEDULER_PATIENCE, min_lr=1e-6)
     criterion = nn.CrossEntropyLoss()
+    # Mixed precision on CUDA (fp16 with loss scaling); a no-op on CPU
+    use_amp = device.type == "cuda"
+    scaler = torch.amp.GradScaler("cuda", enabled=use_amp)
 
     print(f"Training on {n_train} samples" + (f", validating on {n_val}" if n_val else " (no val split)") + f", batch_size={batch_size}. Classes: {train_ds.classes}")
     best_acc = 0.0
@@ -95,34 +112,34 @@ def main():
     for epoch in range(1, args.epochs + 1):
         model.train()
         train_loss = 0.0
+        # Train accuracy is accumulated on the augmented batches as they train
+        train_correct, train_total = 0, 0
         for x, y in train_loader:
-            x, y = x.to(device), y.to(device)
+            x, y = x.to(device, non_blocking=True), y.to(device, non_blocking=True)
             opt.zero_grad()
-            logits = model(x)
-            loss = criterion(logits, y)
-            loss.backward()
+            with torch.autocast(device.type, enabled=use_amp):
+                logits = compiled_model(x)
+                loss = criterion(logits, y)
+            scaler.scale(loss).backward()
             if GRAD_CLIP > 0:
+                scaler.unscale_(opt)  # clip the true gradients, not the scaled ones
                 torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=GRAD_CLIP)
-            opt.step()
+            scaler.step(opt)
+            scaler.update()
             train_loss += loss.item()
+            with torch.no_grad():
+                train_correct += (logits.argmax(dim=1) == y).sum().item()
+                train_total += y.size(0)
         train_loss /= len(train_loader)
+        train_acc = train_correct / train_total if train_total else 0.0
 
         model.eval()
-        correct, total = 0, 0
-        with torch.no_grad():
-            for x, y in train_eval_loader:
-                x, y = x.to(device), y.to(device)
-                logits = model(x)
-                pred = logits.argmax(dim=1)
-                correct += (pred == y).sum().item()
-                total += y.size(0)
-        train_acc = correct / total if total else 0.0
         if val_loader is not None:
             correct, total = 0, 0
-            with torch.no_grad():
+            with torch.no_grad(), torch.autocast(device.type, enabled=use_amp):
                 for x, y in val_loader:
-                    x, y = x.to(device), y.to(device)
-                    logits = model(x)
+                    x, y = x.to(device, non_blocking=True), y.to(device, non_blocking=True)
+                    logits = compiled_model(x)
                     pred = logits.argmax(dim=1)
                     correct += (pred == y).sum().item()
                     total += y.size(0)